@@ -1,13 +1,14 @@
 from asyncio.events import AbstractEventLoop
-from concurrent.futures import Executor
+from concurrent.futures import CancelledError, Executor
 from multiprocessing import cpu_count
-from pathlib import Path
+from pathlib import Path, PurePath
 from platform import uname
 from string import Template
 from sys import executable
 from textwrap import dedent
+from threading import Lock
 from time import monotonic
-from typing import Any, MutableMapping, Optional, cast
+from typing import Any, MutableMapping, Optional, Tuple, cast
 
 from pynvim import Nvim
 from pynvim.api.common import NvimError
@@ -21,18 +22,21 @@ from std2.sched import ticker
 from std2.types import AnyFun
 
 from ._registry import ____
-from .consts import RENDER_RETRIES
+from .consts import RENDER_RETRIES, WATCH_DEBOUNCE, WATCH_RESYNC_TICKS
+from .fs.watch import Watcher, watcher
 from .registry import autocmd, enqueue_event, event_queue, rpc
 from .settings.load import initial as initial_settings
 from .settings.localization import init as init_locale
 from .settings.types import Settings
 from .state.load import initial as initial_state
+from .state.next import settle
 from .state.types import State
-from .transitions.autocmds import save_session
+from .transitions.autocmds import save_on_exit, save_session
 from .transitions.redraw import redraw
-from .transitions.schedule_update import schedule_update
+from .transitions.schedule_update import fs_update, schedule_update
 from .transitions.types import Stage
 from .transitions.version_ctl import vc_refresh
+from .version_ctl.git import cache_stats as vc_cache_stats
 
 
 def _profile(nvim: Nvim, t1: float) -> None:
@@ -56,9 +60,22 @@ class ChadClient(Client):
         self._handlers: MutableMapping[str, RpcCallable] = {}
         self._state: Optional[State] = None
         self._settings: Optional[Settings] = None
+        self._watcher: Optional[Watcher] = watcher()
+        self._lock = Lock()
+        self._drawing: Tuple[Optional[State], Optional[PurePath]] = (None, None)
+
+    def _watch(self) -> None:
+        if self._watcher and self._state:
+            self._watcher.sync(self._state.index | {self._state.root.path})
 
     def on_msg(self, nvim: Nvim, msg: RpcMsg) -> Any:
-        event_queue.put(msg)
+        name, args = msg
+        if name == save_on_exit.name:
+            handler = self._handlers.get(name)
+            if handler and self._state and self._settings:
+                handler(nvim, self._state, self._settings, *args)
+        else:
+            event_queue.put(msg)
         return None
 
     def wait(self, nvim: Nvim) -> int:
@@ -85,10 +102,11 @@ class ChadClient(Client):
                 hl = highlight(*self._settings.view.hl_context.groups)
                 (atomic + autocmd.drain() + hl).commit(nvim)
 
+                init_locale(self._settings.lang)
                 self._state = initial_state(
                     nvim, pool=self._pool, settings=self._settings
                 )
-                init_locale(self._settings.lang)
+                self._watch()
                 return True
 
         try:
@@ -104,13 +122,31 @@ class ChadClient(Client):
                 t1, has_drawn = monotonic(), False
 
         def sched() -> None:
+            enqueue_event(schedule_update)
             enqueue_event(vc_refresh)
-            for _ in ticker(settings.polling_rate, immediately=False):
-                enqueue_event(schedule_update)
+            ticks = ticker(settings.polling_rate, immediately=False)
+            for tick, _ in enumerate(ticks, start=1):
+                resync = not tick % WATCH_RESYNC_TICKS
+                if not self._watcher or self._watcher.lossy:
+                    if self._watcher:
+                        self._watcher.retry()
+                    enqueue_event(schedule_update, resync)
+                elif resync:
+                    enqueue_event(schedule_update)
                 enqueue_event(vc_refresh)
                 enqueue_event(save_session)
+                if settings.profiling and event_queue.merged:
+                    log.info("%s", {**event_queue.merged})
+                if settings.profiling and vc_cache_stats:
+                    log.info("%s", {**vc_cache_stats})
+
+        def watch(wt: Watcher) -> None:
+            for paths in wt.listen(WATCH_DEBOUNCE):
+                enqueue_event(fs_update, paths)
 
         self._pool.submit(sched)
+        if self._watcher:
+            self._pool.submit(watch, self._watcher)
 
         while True:
             msg: RpcMsg = event_queue.get()
@@ -119,22 +155,30 @@ class ChadClient(Client):
                 AnyFun[Optional[Stage]], self._handlers.get(name, nil_handler(name))
             )
 
-            def cdraw() -> None:
+            def handle() -> Optional[Stage]:
+                stage: Optional[Stage] = handler(nvim, self._state, settings, *args)
+                return stage
+
+            def cdraw(state: State) -> None:
                 nonlocal has_drawn
-                stage = handler(nvim, self._state, settings, *args)
-                if stage:
-                    self._state = stage.state
+                with self._lock:
+                    latest, focus = self._drawing
+                    if state is not latest:
+                        return
+                    else:
+                        self._drawing = (state, None)
 
+                with with_suppress():
                     for _ in range(RENDER_RETRIES - 1):
                         try:
-                            redraw(nvim, state=self._state, focus=stage.focus)
+                            redraw(nvim, state=state, focus=focus)
                         except NvimError:
                             pass
                         else:
                             break
                     else:
                         try:
-                            redraw(nvim, state=self._state, focus=stage.focus)
+                            redraw(nvim, state=state, focus=focus)
                         except NvimError as e:
                             log.warn("%s", e)
 
@@ -143,4 +187,27 @@ class ChadClient(Client):
                         _profile(nvim, t1=t1)
 
             with with_suppress():
-                threadsafe_call(nvim, cdraw)
+                cancelled = event_queue.cancellation()
+                stage = threadsafe_call(nvim, handle)
+                if stage:
+                    try:
+                        state = settle(
+                            stage.state, settings=settings, cancelled=cancelled
+                        )
+                    except CancelledError:
+                        self._state = stage.state
+                    else:
+                        with self._lock:
+                            _, focus = self._drawing
+                            self._drawing = (state, stage.focus or focus)
+                        if (
+                            settings.version_ctl.scoped
+                            and self._state
+                            and state.index is not self._state.index
+                        ):
+                            enqueue_event(vc_refresh)
+                        self._state = state
+                        self._watch()
+                        nvim.async_call(cdraw, state)
+                        if stage.message:
+                            nvim.async_call(write, nvim, stage.message)
@@ -7,8 +7,17 @@ GIL_SWITCH = 1 / 1000
 IS_WIN = name == "nt"
 
 RENDER_RETRIES = 3
+VIRTUAL_THRESHOLD = 5000
+VIRTUAL_MARGIN = 100
+DECORATION_CACHE_SIZE = 4096
 
 WALK_PARALLELISM_FACTOR = 100
+WALK_BATCH_TARGET = 1 / 500
+PROCESS_WALK_THRESHOLD = 64
+VC_CACHE_TTL = 30
+WATCH_DEBOUNCE = 1 / 20
+WATCH_RESYNC_TICKS = 10
+EVENT_DEBOUNCE = 1 / 20
 FOLDER_MODE = 0o755
 FILE_MODE = 0o644
 
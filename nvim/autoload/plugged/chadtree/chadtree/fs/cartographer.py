@@ -1,7 +1,11 @@
-from concurrent.futures import Executor, wait
+from concurrent.futures import CancelledError, Executor, wait
 from contextlib import suppress
-from fnmatch import fnmatch
-from os import listdir, stat
+from dataclasses import dataclass, replace
+from enum import IntEnum, auto
+from functools import reduce
+from locale import strxfrm
+from operator import or_
+from os import DirEntry, fsdecode, fsencode, scandir, stat, stat_result
 from pathlib import PurePath
 from queue import SimpleQueue
 from stat import (
@@ -16,22 +20,37 @@ from stat import (
     S_ISVTX,
     S_IWOTH,
 )
+from struct import Struct
+from time import monotonic
 from typing import (
     AbstractSet,
-    Iterable,
+    Any,
+    Callable,
     Iterator,
     Mapping,
     MutableMapping,
+    MutableSequence,
     Optional,
+    Sequence,
+    Tuple,
     cast,
 )
 
-from std2.itertools import chunk
+from std2.types import never
 
-from ..consts import WALK_PARALLELISM_FACTOR
-from ..state.types import Index
+from ..consts import (
+    PROCESS_WALK_THRESHOLD,
+    WALK_BATCH_TARGET,
+    WALK_PARALLELISM_FACTOR,
+)
+from ..settings.types import Classifiers, Settings
+from ..state.types import Index, Pages
+from ..view.types import Sortby
+from .glob import match_glob
+from .intern import intern_path
 from .ops import ancestors
-from .types import Ignored, Mode, Node
+from .trie import PathSet
+from .types import Mode, Node, Signature
 
 _FILE_MODES: Mapping[int, Mode] = {
     S_IEXEC: Mode.executable,
@@ -51,70 +70,298 @@ def _fs_modes(stat: int) -> Iterator[Mode]:
         yield Mode.pipe
     if S_ISSOCK(stat):
         yield Mode.socket
-    for bit, mode in _FILE_MODES.items():
-        if stat & bit == bit:
-            yield mode
 
 
-def _fs_stat(path: PurePath) -> AbstractSet[Mode]:
+def _fs_mode(stat: int) -> Mode:
+    return reduce(or_, _fs_modes(stat), Mode(0))
+
+
+def _perm_mode(stat: int) -> Mode:
+    return reduce(
+        or_, (mode for bit, mode in _FILE_MODES.items() if stat & bit == bit), Mode(0)
+    )
+
+
+def _fs_stat(path: PurePath) -> Tuple[Mode, Optional[stat_result]]:
     try:
         info = stat(path, follow_symlinks=False)
     except FileNotFoundError:
-        return {Mode.orphan_link}
+        return Mode.orphan_link, None
     else:
         if S_ISLNK(info.st_mode):
             try:
                 link_info = stat(path, follow_symlinks=True)
             except (FileNotFoundError, NotADirectoryError):
-                return {Mode.orphan_link}
+                return Mode.orphan_link, None
             else:
-                mode = {*_fs_modes(link_info.st_mode)}
-                return mode | {Mode.link}
+                mode = _fs_mode(link_info.st_mode)
+                return mode | Mode.link, link_info
         else:
-            mode = {*_fs_modes(info.st_mode)}
-            return mode
+            mode = _fs_mode(info.st_mode)
+            return mode, info
+
 
+_PERM_MODES = frozenset(_FILE_MODES.values())
 
-def user_ignored(node: Node, ignores: Ignored) -> bool:
+
+def _dirent_stat(entry: DirEntry, listed: bool) -> Tuple[Mode, Optional[stat_result]]:
+    try:
+        if entry.is_symlink():
+            try:
+                link_info = entry.stat(follow_symlinks=True)
+            except (FileNotFoundError, NotADirectoryError):
+                return Mode.orphan_link, None
+            else:
+                mode = _fs_mode(link_info.st_mode)
+                return mode | Mode.link, link_info
+        elif listed:
+            info = entry.stat(follow_symlinks=False)
+            return _fs_mode(info.st_mode), info
+        elif entry.is_dir(follow_symlinks=False):
+            return Mode.folder, None
+        elif entry.is_file(follow_symlinks=False):
+            return Mode.file, None
+        else:
+            info = entry.stat(follow_symlinks=False)
+            return _fs_mode(info.st_mode), info
+    except FileNotFoundError:
+        return Mode.orphan_link, None
+
+
+def stat_perms(settings: Settings) -> bool:
+    context = settings.view.hl_context
+    return not _PERM_MODES.isdisjoint(
+        context.mode_pre.keys() | context.mode_post.keys()
+    )
+
+
+def perm_bits(node: Node) -> Mode:
+    if Mode.orphan_link in node.mode:
+        return Mode(0)
+    try:
+        info = stat(node.path, follow_symlinks=True)
+    except (OSError, ValueError):
+        return Mode(0)
+    else:
+        return _perm_mode(info.st_mode)
+
+
+def _signature(info: Optional[stat_result]) -> Optional[Signature]:
+    if info and S_ISDIR(info.st_mode):
+        return info.st_mtime_ns, info.st_ino, info.st_size
+    else:
+        return None
+
+
+def _stat_signature(path: PurePath) -> Optional[Signature]:
+    try:
+        info = stat(path, follow_symlinks=True)
+    except (OSError, ValueError):
+        return None
+    else:
+        return _signature(info)
+
+
+class _CompVals(IntEnum):
+    FOLDER = auto()
+    FILE = auto()
+
+
+def sort_key(
+    sort_by: Sequence[Sortby], path: PurePath, folder: bool
+) -> Tuple[Any, ...]:
+    def cont() -> Iterator[Any]:
+        for sb in sort_by:
+            if sb is Sortby.is_folder:
+                yield _CompVals.FOLDER if folder else _CompVals.FILE
+            elif sb is Sortby.ext:
+                yield "" if folder else strxfrm(path.suffix)
+            elif sb is Sortby.file_name:
+                yield strxfrm(path.name)
+            else:
+                never(sb)
+
+    return tuple(cont())
+
+
+def _ignored(path: PurePath, classifiers: Classifiers) -> bool:
     return (
-        node.path.name in ignores.name_exact
-        or any(fnmatch(node.path.name, pattern) for pattern in ignores.name_glob)
-        or any(fnmatch(str(node.path), pattern) for pattern in ignores.path_glob)
+        match_glob(classifiers.ignore_name, path.name) is not None
+        or match_glob(classifiers.ignore_path, str(path)) is not None
+    )
+
+
+def user_ignored(node: Node, classifiers: Classifiers) -> bool:
+    return _ignored(node.path, classifiers=classifiers)
+
+
+def _scandir(path: PurePath) -> Iterator[DirEntry]:
+    with suppress(NotADirectoryError, PermissionError):
+        with scandir(path) as it:
+            yield from it
+
+
+def _drain(queue: SimpleQueue) -> Iterator[Any]:
+    while not queue.empty():
+        yield queue.get()
+
+
+@dataclass(frozen=True)
+class _Opts:
+    index: Index
+    pages: Pages
+    pinned: AbstractSet[PurePath]
+    limit: int
+    sort_by: Sequence[Sortby]
+    classifiers: Classifiers
+    show_hidden: bool
+    procs: Optional[Executor]
+    cancelled: Callable[[], bool]
+
+
+def _never() -> bool:
+    return False
+
+
+def _opts(
+    settings: Settings,
+    index: Index,
+    pages: Pages,
+    show_hidden: bool,
+    current: Optional[PurePath],
+    procs: Optional[Executor],
+    cancelled: Callable[[], bool],
+) -> _Opts:
+    return _Opts(
+        index=index,
+        pages=pages,
+        pinned=ancestors(current) | {current} if current else frozenset(),
+        limit=settings.listing_limit,
+        sort_by=settings.view.sort_by,
+        classifiers=settings.classifiers,
+        show_hidden=show_hidden,
+        procs=procs,
+        cancelled=cancelled,
     )
 
 
-def _listdir(path: PurePath) -> Iterator[PurePath]:
-    with suppress(NotADirectoryError):
-        yield from map(PurePath, listdir(path))
+def _check(opts: _Opts) -> None:
+    if opts.cancelled():
+        raise CancelledError()
+
+
+def _entry_is_dir(entry: DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _listdir(path: PurePath, opts: _Opts) -> Tuple[Sequence[DirEntry], int]:
+    limit = opts.limit * opts.pages.get(path, 1)
+    entries = tuple(_scandir(path))
+    if not limit or len(entries) <= limit:
+        return entries, 0
+    else:
+        hidden: MutableSequence[DirEntry] = []
+        visible: MutableSequence[DirEntry] = []
+        for entry in entries:
+            child = path / entry.name
+            if not opts.show_hidden and _ignored(child, classifiers=opts.classifiers):
+                hidden.append(entry)
+            else:
+                visible.append(entry)
+
+        ranked = sorted(
+            visible,
+            key=lambda entry: sort_key(
+                opts.sort_by, path=PurePath(entry.name), folder=_entry_is_dir(entry)
+            ),
+        )
+        kept = tuple(
+            entry
+            for entry in ranked[limit:]
+            if path / entry.name in opts.index or path / entry.name in opts.pinned
+        )
+        return (*hidden, *ranked[:limit], *kept), len(ranked) - limit - len(kept)
+
+
+def _batch_size(elapsed: float, listed: int) -> int:
+    latency = elapsed / max(listed, 1)
+    size = int(WALK_BATCH_TARGET / latency) if latency else WALK_PARALLELISM_FACTOR
+    return min(max(size, 1), WALK_PARALLELISM_FACTOR)
 
 
 def _new(
-    roots: Iterable[PurePath], index: Index, acc: SimpleQueue, bfs_q: SimpleQueue
+    pool: Executor,
+    roots: Sequence[PurePath],
+    opts: _Opts,
+    acc: SimpleQueue,
+    truncs: SimpleQueue,
+    tasks: SimpleQueue,
 ) -> None:
+    if opts.cancelled():
+        return
+
+    t1 = monotonic()
+    found: MutableSequence[PurePath] = []
     for root in roots:
-        with suppress(PermissionError):
-            mode = _fs_stat(root)
-            _ancestors = ancestors(root)
+        entries, truncated = _listdir(root, opts=opts)
+        if truncated:
+            truncs.put((root, truncated))
+
+        for entry in entries:
+            path = root / entry.name
+            listed = path in opts.index
+            mode, info = _dirent_stat(entry, listed=listed)
             node = Node(
-                path=root,
+                path=path,
+                id=intern_path(path),
                 mode=mode,
-                ancestors=_ancestors,
+                signature=_signature(info) if listed else None,
+                truncated=0,
+                children={},
             )
             acc.put(node)
 
-            if root in index:
-                for item in _listdir(root):
-                    path = root / item
-                    bfs_q.put(path)
+            if listed and Mode.folder in mode:
+                found.append(path)
+
+    n = _batch_size(monotonic() - t1, listed=len(roots))
+    for idx in range(0, len(found), n):
+        _spawn(
+            pool,
+            roots=found[idx : idx + n],
+            opts=opts,
+            acc=acc,
+            truncs=truncs,
+            tasks=tasks,
+        )
+
 
+def _spawn(
+    pool: Executor,
+    roots: Sequence[PurePath],
+    opts: _Opts,
+    acc: SimpleQueue,
+    truncs: SimpleQueue,
+    tasks: SimpleQueue,
+) -> None:
+    task = pool.submit(
+        _new, pool, roots=roots, opts=opts, acc=acc, truncs=truncs, tasks=tasks
+    )
+    tasks.put(task)
 
-def _join(nodes: SimpleQueue) -> Node:
+
+def _join(nodes: SimpleQueue, truncs: SimpleQueue) -> Node:
     root_node: Optional[Node] = None
     acc: MutableMapping[PurePath, Node] = {}
+    truncated: Mapping[PurePath, int] = dict(_drain(truncs))
 
-    while not nodes.empty():
-        node: Node = nodes.get()
+    for node in _drain(nodes):
         path = node.path
+        if path in truncated:
+            node = replace(node, truncated=truncated[path])
         acc[path] = node
 
         parent = acc.get(path.parent)
@@ -131,50 +378,330 @@ def _join(nodes: SimpleQueue) -> Node:
         return root_node
 
 
-def new(pool: Executor, root: PurePath, index: Index) -> Node:
-    acc: SimpleQueue = SimpleQueue()
-    bfs_q: SimpleQueue = SimpleQueue()
+_HEAD = Struct("<iIIIB")
+_SIG = Struct("<qQQ")
 
-    def drain() -> Iterator[str]:
-        while not bfs_q.empty():
-            yield bfs_q.get()
 
-    bfs_q.put(root)
-    while not bfs_q.empty():
-        tasks = tuple(
-            pool.submit(_new, roots=paths, index=index, acc=acc, bfs_q=bfs_q)
-            for paths in chunk(drain(), n=WALK_PARALLELISM_FACTOR)
+def _dump(
+    root: PurePath, opts: _Opts, shallow: bool
+) -> Tuple[bytes, Sequence[PurePath]]:
+    buf = bytearray()
+    deferred: MutableSequence[PurePath] = []
+    count = 0
+
+    def put(
+        parent: int,
+        name: str,
+        mode: Mode,
+        info: Optional[stat_result],
+        listed: bool,
+        truncated: int,
+    ) -> int:
+        nonlocal count
+        encoded = fsencode(name)
+        signature = _signature(info) if listed else None
+        head = _HEAD.pack(parent, len(encoded), mode, truncated, signature is not None)
+        buf.extend(head)
+        buf.extend(encoded)
+        if signature:
+            buf.extend(_SIG.pack(*signature))
+        count += 1
+        return count - 1
+
+    mode, info = _fs_stat(root)
+    stack = [(root, -1, "", mode, info)]
+    while stack:
+        path, parent, name, mode, info = stack.pop()
+        try:
+            entries, truncated = _listdir(path, opts=opts)
+        except FileNotFoundError:
+            entries, truncated = (), 0
+        idx = put(parent, name, mode=mode, info=info, listed=True, truncated=truncated)
+
+        for entry in entries:
+            child = path / entry.name
+            listed = child in opts.index
+            child_mode, child_info = _dirent_stat(entry, listed=listed)
+            if listed and Mode.folder in child_mode:
+                if shallow:
+                    deferred.append(child)
+                else:
+                    stack.append((child, idx, entry.name, child_mode, child_info))
+            else:
+                put(
+                    idx,
+                    entry.name,
+                    mode=child_mode,
+                    info=child_info,
+                    listed=listed,
+                    truncated=0,
+                )
+
+    return bytes(buf), deferred
+
+
+def _load(root: PurePath, buf: bytes, acc: SimpleQueue) -> None:
+    paths: MutableSequence[PurePath] = []
+    offset = 0
+    while offset < len(buf):
+        parent, size, bits, truncated, signed = _HEAD.unpack_from(buf, offset)
+        offset += _HEAD.size
+        name = fsdecode(buf[offset : offset + size])
+        offset += size
+        if signed:
+            signature: Optional[Signature] = cast(
+                Signature, _SIG.unpack_from(buf, offset)
+            )
+            offset += _SIG.size
+        else:
+            signature = None
+
+        path = paths[parent] / name if parent >= 0 else root
+        paths.append(path)
+        node = Node(
+            path=path,
+            id=intern_path(path),
+            mode=Mode(bits),
+            signature=signature,
+            truncated=truncated,
+            children={},
         )
-        wait(tasks)
+        acc.put(node)
 
-    return _join(acc)
 
+def _subtree(opts: _Opts, index: PathSet, root: PurePath) -> _Opts:
+    nested = frozenset(index.descendants_of(root))
+    pages = {path: page for path, page in opts.pages.items() if path in nested}
+    return replace(opts, index=nested, pages=pages, procs=None, cancelled=_never)
 
-def _update(
-    pool: Executor, root: Node, index: Index, paths: AbstractSet[PurePath]
+
+def _walk_procs(procs: Executor, root: PurePath, opts: _Opts) -> Node:
+    acc: SimpleQueue = SimpleQueue()
+    head, deferred = _dump(root, opts=opts, shallow=True)
+    _load(root, buf=head, acc=acc)
+
+    index = PathSet.of(opts.index)
+    tasks = tuple(
+        procs.submit(
+            _dump, path, opts=_subtree(opts, index=index, root=path), shallow=False
+        )
+        for path in deferred
+    )
+    try:
+        for path, task in zip(deferred, tasks):
+            buf, _ = task.result()
+            _check(opts)
+            _load(path, buf=buf, acc=acc)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return _join(acc, truncs=SimpleQueue())
+
+
+def _walk(pool: Executor, root: PurePath, opts: _Opts) -> Node:
+    if opts.procs and root in opts.index:
+        nested = PathSet.of(opts.index).descendants_of(root)
+        if len(nested) > PROCESS_WALK_THRESHOLD:
+            return _walk_procs(opts.procs, root=root, opts=opts)
+
+    acc: SimpleQueue = SimpleQueue()
+    truncs: SimpleQueue = SimpleQueue()
+    tasks: SimpleQueue = SimpleQueue()
+
+    mode, info = _fs_stat(root)
+    node = Node(
+        path=root,
+        id=intern_path(root),
+        mode=mode,
+        signature=_signature(info) if root in opts.index else None,
+        truncated=0,
+        children={},
+    )
+    acc.put(node)
+    if root in opts.index:
+        _spawn(pool, roots=(root,), opts=opts, acc=acc, truncs=truncs, tasks=tasks)
+
+    for task in _drain(tasks):
+        wait((task,))
+        _check(opts)
+
+    return _join(acc, truncs=truncs)
+
+
+def new(
+    pool: Executor,
+    root: PurePath,
+    index: Index,
+    *,
+    settings: Settings,
+    pages: Pages,
+    show_hidden: bool = False,
+    current: Optional[PurePath] = None,
+    procs: Optional[Executor] = None,
+    cancelled: Callable[[], bool] = _never,
 ) -> Node:
-    if root.path in paths:
-        return new(pool, root=root.path, index=index)
+    opts = _opts(
+        settings,
+        index=index,
+        pages=pages,
+        show_hidden=show_hidden,
+        current=current,
+        procs=procs,
+        cancelled=cancelled,
+    )
+    return _walk(pool, root=root, opts=opts)
+
+
+def stub(path: PurePath) -> Node:
+    return Node(
+        path=path,
+        id=intern_path(path),
+        mode=Mode.folder,
+        signature=None,
+        truncated=0,
+        children={},
+    )
+
+
+def _relist(
+    pool: Executor, node: Node, opts: _Opts, paths: AbstractSet[PurePath]
+) -> Node:
+    _check(opts)
+    mode, info = _fs_stat(node.path)
+    listed = node.path in opts.index
+    signature = _signature(info) if listed else None
+    children: MutableMapping[PurePath, Node] = {}
+    entries, truncated = _listdir(node.path, opts=opts) if listed else ((), 0)
+    for entry in entries:
+        path = node.path / entry.name
+        child_listed = path in opts.index
+        child_mode, _ = _dirent_stat(entry, listed=child_listed)
+        prev = node.children.get(path)
+        if prev and prev.mode == child_mode and path not in paths:
+            children[path] = prev
+        elif child_listed and Mode.folder in child_mode:
+            children[path] = _walk(pool, root=path, opts=opts)
+        else:
+            children[path] = Node(
+                path=path,
+                id=intern_path(path),
+                mode=child_mode,
+                signature=None,
+                truncated=0,
+                children={},
+            )
+
+    unchanged = (
+        mode == node.mode
+        and signature == node.signature
+        and truncated == node.truncated
+        and children.keys() == node.children.keys()
+        and all(child is node.children[path] for path, child in children.items())
+    )
+    if unchanged:
+        return node
     else:
-        children = {
-            k: _update(pool, root=v, index=index, paths=paths)
-            for k, v in root.children.items()
-        }
         return Node(
-            path=root.path,
-            mode=root.mode,
-            ancestors=root.ancestors,
+            path=node.path,
+            id=node.id,
+            mode=mode,
+            signature=signature,
+            truncated=truncated,
             children=children,
         )
 
 
+def _update(
+    pool: Executor,
+    root: Node,
+    opts: _Opts,
+    paths: AbstractSet[PurePath],
+    affected: AbstractSet[PurePath],
+) -> Node:
+    node = (
+        _relist(pool, node=root, opts=opts, paths=paths) if root.path in paths else root
+    )
+    updated = {
+        path: _update(pool, root=child, opts=opts, paths=paths, affected=affected)
+        for path, child in node.children.items()
+        if path in affected
+    }
+    if all(child is node.children[path] for path, child in updated.items()):
+        return node
+    else:
+        return replace(node, children={**node.children, **updated})
+
+
 def update(
-    pool: Executor, root: Node, *, index: Index, paths: AbstractSet[PurePath]
+    pool: Executor,
+    root: Node,
+    *,
+    settings: Settings,
+    index: Index,
+    pages: Pages,
+    paths: AbstractSet[PurePath],
+    show_hidden: bool = False,
+    current: Optional[PurePath] = None,
+    procs: Optional[Executor] = None,
+    cancelled: Callable[[], bool] = _never,
 ) -> Node:
-    try:
-        return _update(pool, root=root, index=index, paths=paths)
-    except FileNotFoundError:
-        return new(pool, root=root.path, index=index)
+    affected = {ancestor for path in paths for ancestor in ancestors(path)} | paths
+    if root.path not in affected:
+        return root
+    else:
+        opts = _opts(
+            settings,
+            index=index,
+            pages=pages,
+            show_hidden=show_hidden,
+            current=current,
+            procs=procs,
+            cancelled=cancelled,
+        )
+        try:
+            return _update(pool, root=root, opts=opts, paths=paths, affected=affected)
+        except FileNotFoundError:
+            return _walk(pool, root=root.path, opts=opts)
+
+
+def signatures(
+    pool: Executor, paths: AbstractSet[PurePath]
+) -> Mapping[PurePath, Optional[Signature]]:
+    ordered = tuple(paths)
+    return dict(zip(ordered, pool.map(_stat_signature, ordered)))
+
+
+def _listed(node: Node, index: Index) -> Iterator[Node]:
+    if node.path in index and is_dir(node):
+        yield node
+        for child in node.children.values():
+            yield from _listed(child, index=index)
+
+
+def outdated(
+    root: Node, *, index: Index, sigs: Mapping[PurePath, Optional[Signature]]
+) -> AbstractSet[PurePath]:
+    return {
+        node.path
+        for node in _listed(root, index=index)
+        if node.signature is None or sigs.get(node.path) != node.signature
+    }
+
+
+def truncated(root: Node, *, paths: AbstractSet[PurePath]) -> AbstractSet[PurePath]:
+    def cont(node: Node) -> Iterator[PurePath]:
+        if node.truncated:
+            yield node.path
+        for path, child in node.children.items():
+            if path in paths:
+                yield from cont(child)
+
+    return {*cont(root)} if root.path in paths else set()
+
+
+def modes(mode: Mode) -> Sequence[Mode]:
+    return tuple(m for m in Mode if m in mode)
 
 
 def is_dir(node: Node) -> bool:
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+from fnmatch import translate
+from os.path import normcase
+from re import Match, Pattern, compile, sub
+from typing import (
+    AbstractSet,
+    Generic,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+_MAGIC = frozenset("*?[")
+
+
+@dataclass(frozen=True)
+class Glob(Generic[T]):
+    exact: Mapping[str, int]
+    suffix: Mapping[str, int]
+    suffix_lens: AbstractSet[int]
+    regex: Optional[Pattern]
+    values: Sequence[T]
+
+
+def _isolate(idx: int, pattern: str) -> str:
+    regex = translate(pattern)
+    named = sub(r"\(\?P<(\w+)>", rf"(?P<_{idx}_\1>", regex)
+    refed = sub(r"\(\?P=(\w+)\)", rf"(?P=_{idx}_\1)", named)
+    return f"(?P<_{idx}>{refed})"
+
+
+def compile_glob(
+    globs: Iterable[Tuple[str, T]], exact_names: Iterable[Tuple[str, T]] = ()
+) -> Glob[T]:
+    exact: MutableMapping[str, int] = {}
+    suffix: MutableMapping[str, int] = {}
+    regexes: MutableSequence[str] = []
+    values: MutableSequence[T] = []
+
+    for name, value in exact_names:
+        exact.setdefault(normcase(name), len(values))
+        values.append(value)
+
+    for idx, (glob, value) in enumerate(globs, start=len(values)):
+        pattern = normcase(glob)
+        values.append(value)
+        if _MAGIC.isdisjoint(pattern):
+            exact.setdefault(pattern, idx)
+        elif pattern.startswith("*") and _MAGIC.isdisjoint(pattern[1:]):
+            suffix.setdefault(pattern[1:], idx)
+        else:
+            regexes.append(_isolate(idx, pattern=pattern))
+
+    regex = compile("|".join(regexes)) if regexes else None
+    return Glob(
+        exact=exact,
+        suffix=suffix,
+        suffix_lens={len(key) for key in suffix},
+        regex=regex,
+        values=values,
+    )
+
+
+def _matches(glob: Glob[T], name: str) -> Iterator[int]:
+    idx = glob.exact.get(name)
+    if idx is not None:
+        yield idx
+
+    for length in glob.suffix_lens:
+        if length <= len(name):
+            idx = glob.suffix.get(name[len(name) - length :])
+            if idx is not None:
+                yield idx
+
+    if glob.regex:
+        match: Optional[Match] = glob.regex.match(name)
+        if match and match.lastgroup:
+            yield int(match.lastgroup[1:])
+
+
+def glob_index(glob: Glob[T], name: str) -> Optional[int]:
+    return min(_matches(glob, name=normcase(name)), default=None)
+
+
+def match_glob(glob: Glob[T], name: str) -> Optional[T]:
+    idx = glob_index(glob, name=name)
+    return None if idx is None else glob.values[idx]
@@ -0,0 +1,22 @@
+from pathlib import PurePath
+from threading import Lock
+from typing import MutableMapping, MutableSequence
+
+_LOCK = Lock()
+_IDS: MutableMapping[PurePath, int] = {}
+_PATHS: MutableSequence[PurePath] = []
+
+
+def intern_path(path: PurePath) -> int:
+    pid = _IDS.get(path)
+    if pid is None:
+        with _LOCK:
+            pid = _IDS.get(path)
+            if pid is None:
+                pid = _IDS[path] = len(_PATHS)
+                _PATHS.append(path)
+    return pid
+
+
+def path_of(pid: int) -> PurePath:
+    return _PATHS[pid]
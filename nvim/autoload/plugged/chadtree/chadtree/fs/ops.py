@@ -12,6 +12,7 @@ from stat import S_ISDIR, S_ISLNK, filemode
 from typing import AbstractSet, Iterable, Mapping, Optional
 
 from ..consts import FILE_MODE, FOLDER_MODE
+from .trie import PathSet
 
 
 def ancestors(path: PurePath) -> AbstractSet[PurePath]:
@@ -19,7 +20,7 @@ def ancestors(path: PurePath) -> AbstractSet[PurePath]:
 
 
 def unify_ancestors(paths: AbstractSet[PurePath]) -> AbstractSet[PurePath]:
-    return {p for p in paths if ancestors(p).isdisjoint(paths)}
+    return PathSet.of(paths).tops()
 
 
 @dataclass(frozen=True)
@@ -48,7 +49,6 @@ try:
         except KeyError:
             return str(gid)
 
-
 except ImportError:
 
     def _get_username(uid: int) -> str:
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import PurePath
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    MutableMapping,
+    Optional,
+)
+
+_Trie = MutableMapping[str, Any]
+_LEAF = ""
+
+
+def _insert(trie: _Trie, path: PurePath) -> None:
+    for part in path.parts:
+        trie = trie.setdefault(part, {})
+    trie[_LEAF] = path
+
+
+def _walk(trie: _Trie, ordered: bool) -> Iterator[PurePath]:
+    leaf = trie.get(_LEAF)
+    if leaf is not None:
+        yield leaf
+    parts = trie.keys() - {_LEAF}
+    for part in sorted(parts) if ordered else parts:
+        yield from _walk(trie[part], ordered=ordered)
+
+
+def _prune(trie: _Trie, keep: Callable[[PurePath], bool]) -> Iterator[PurePath]:
+    leaf = trie.get(_LEAF)
+    if leaf is not None:
+        if keep(leaf):
+            yield leaf
+        else:
+            return
+    for part, sub in trie.items():
+        if part != _LEAF:
+            yield from _prune(sub, keep=keep)
+
+
+def _tops(trie: _Trie) -> Iterator[PurePath]:
+    leaf = trie.get(_LEAF)
+    if leaf is not None:
+        yield leaf
+    else:
+        for sub in trie.values():
+            yield from _tops(sub)
+
+
+class PathSet(AbstractSet[PurePath]):
+    __slots__ = ("_paths", "_trie")
+
+    def __init__(self, paths: Iterable[PurePath] = ()) -> None:
+        self._paths = frozenset(paths)
+        self._trie: Optional[_Trie] = None
+
+    @classmethod
+    def of(cls, paths: AbstractSet[PurePath]) -> PathSet:
+        return paths if isinstance(paths, PathSet) else cls(paths)
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[Any]) -> AbstractSet[Any]:
+        return cls(it)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._paths
+
+    def __iter__(self) -> Iterator[PurePath]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({set(self._paths)!r})"
+
+    def __or__(self, other: AbstractSet[Any]) -> AbstractSet[Any]:
+        if all(path in self._paths for path in other):
+            return self
+        else:
+            return PathSet(self._paths.union(other))
+
+    __ror__ = __or__
+
+    def _root(self) -> _Trie:
+        if self._trie is None:
+            trie: _Trie = {}
+            for path in self._paths:
+                _insert(trie, path=path)
+            self._trie = trie
+        return self._trie
+
+    def _find(self, path: PurePath) -> Optional[_Trie]:
+        trie: Optional[_Trie] = self._root()
+        for part in path.parts:
+            trie = trie.get(part) if trie else None
+        return trie
+
+    def ordered(self) -> Iterator[PurePath]:
+        return _walk(self._root(), ordered=True)
+
+    def descendants_of(self, path: PurePath) -> PathSet:
+        trie = self._find(path)
+        return PathSet(_walk(trie, ordered=False) if trie else ())
+
+    def has_ancestor_in(self, path: PurePath) -> bool:
+        return any(parent in self._paths for parent in path.parents)
+
+    def without_prefix(self, path: PurePath) -> PathSet:
+        descendants = self.descendants_of(path)
+        return PathSet(self._paths - descendants._paths) if descendants else self
+
+    def prune(self, keep: Callable[[PurePath], bool]) -> PathSet:
+        pruned = PathSet(_prune(self._root(), keep=keep))
+        return self if len(pruned) == len(self) else pruned
+
+    def tops(self) -> PathSet:
+        return PathSet(_tops(self._root()))
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from enum import IntEnum, auto
+from dataclasses import dataclass
+from enum import IntFlag, auto
 from pathlib import PurePath
-from typing import AbstractSet, Mapping, Optional, Sequence
+from typing import AbstractSet, Mapping, Optional, Sequence, Tuple
 
 
-class Mode(IntEnum):
+class Mode(IntFlag):
     orphan_link = auto()
     link = auto()
     sticky_writable = auto()
@@ -26,12 +26,19 @@ class Mode(IntEnum):
     file = auto()
 
 
+Signature = Tuple[int, int, int]
+
+
 @dataclass(frozen=True)
 class Node:
-    mode: AbstractSet[Mode]
+    __slots__ = ("path", "id", "mode", "signature", "truncated", "children")
+
     path: PurePath
-    ancestors: AbstractSet[PurePath]
-    children: Mapping[PurePath, Node] = field(default_factory=dict)
+    id: int
+    mode: Mode
+    signature: Optional[Signature]
+    truncated: int
+    children: Mapping[PurePath, Node]
 
 
 @dataclass(frozen=True)
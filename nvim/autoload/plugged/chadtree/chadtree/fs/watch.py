@@ -0,0 +1,128 @@
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from errno import ENOSPC
+from os import fsdecode, fsencode, read
+from pathlib import PurePath
+from select import select
+from struct import calcsize, unpack_from
+from sys import platform
+from threading import Lock
+from typing import AbstractSet, Iterator, MutableMapping, MutableSet, Optional
+
+_IN_CLOEXEC = 0o2000000
+
+_IN_ATTRIB = 0x00000004
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_EXCL_UNLINK = 0x04000000
+
+_MASK = (
+    _IN_ATTRIB
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+    | _IN_EXCL_UNLINK
+)
+_SELF = _IN_DELETE_SELF | _IN_MOVE_SELF
+
+_EVENT = "iIII"
+_EVENT_SIZE = calcsize(_EVENT)
+_BUF_SIZE = 2**16
+
+
+class Watcher:
+    def __init__(self, libc: CDLL) -> None:
+        self._libc = libc
+        self._lock = Lock()
+        self._paths: MutableMapping[PurePath, int] = {}
+        self._wds: MutableMapping[int, PurePath] = {}
+        self._exhausted: MutableSet[PurePath] = set()
+
+        fd = self._libc.inotify_init1(_IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(get_errno(), "inotify_init1")
+        else:
+            self._fd: int = fd
+
+    @property
+    def lossy(self) -> bool:
+        return bool(self._exhausted)
+
+    def retry(self) -> None:
+        with self._lock:
+            for path in self._exhausted:
+                self._paths.pop(path, None)
+            self._exhausted.clear()
+
+    def sync(self, paths: AbstractSet[PurePath]) -> None:
+        with self._lock:
+            for path in self._paths.keys() - paths:
+                wd = self._paths.pop(path)
+                self._exhausted.discard(path)
+                if wd >= 0:
+                    self._wds.pop(wd, None)
+                    self._libc.inotify_rm_watch(self._fd, wd)
+
+            for path in paths - self._paths.keys():
+                wd = self._libc.inotify_add_watch(self._fd, fsencode(path), _MASK)
+                self._paths[path] = wd
+                if wd >= 0:
+                    self._wds[wd] = path
+                elif get_errno() == ENOSPC:
+                    self._exhausted.add(path)
+
+    def _drain(self, acc: MutableSet[PurePath]) -> None:
+        buf = read(self._fd, _BUF_SIZE)
+        offset = 0
+        with self._lock:
+            while offset < len(buf):
+                wd, mask, _, length = unpack_from(_EVENT, buf, offset)
+                begin = offset + _EVENT_SIZE
+                offset = begin + length
+
+                if mask & _IN_Q_OVERFLOW:
+                    acc |= {*self._wds.values()}
+                elif mask & _IN_IGNORED:
+                    path = self._wds.pop(wd, None)
+                    if path is not None and self._paths.get(path) == wd:
+                        self._paths.pop(path)
+                else:
+                    path = self._wds.get(wd)
+                    if path is not None:
+                        acc.add(path.parent if mask & _SELF else path)
+                        name = buf[begin:offset].rstrip(b"\0")
+                        if mask & _IN_ATTRIB and name:
+                            acc.add(path / fsdecode(name))
+
+    def listen(self, debounce: float) -> Iterator[AbstractSet[PurePath]]:
+        while True:
+            acc: MutableSet[PurePath] = set()
+            self._drain(acc)
+            while select((self._fd,), (), (), debounce)[0]:
+                self._drain(acc)
+
+            if acc:
+                yield acc
+
+
+def watcher() -> Optional[Watcher]:
+    if not platform.startswith("linux"):
+        return None
+    else:
+        name = find_library("c")
+        try:
+            libc = CDLL(name, use_errno=True)
+            return Watcher(libc)
+        except (AttributeError, OSError):
+            return None
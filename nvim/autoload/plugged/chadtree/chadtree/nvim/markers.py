@@ -10,6 +10,7 @@ from pynvim_pp.api import get_cwd
 from std2.string import removeprefix
 
 from ..fs.ops import ancestors
+from ..fs.trie import PathSet
 from .types import Markers
 
 
@@ -31,7 +32,7 @@ def _bookmarks(nvim: Nvim) -> AbstractSet[PurePath]:
                     path = file if file.is_absolute() else cwd / file.expanduser()
                     yield path
 
-    return {*it()}
+    return PathSet(it())
 
 
 def _quickfix(nvim: Nvim) -> Mapping[PurePath, int]:
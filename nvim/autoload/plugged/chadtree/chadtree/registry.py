@@ -1,10 +1,11 @@
-from queue import SimpleQueue
 from typing import Any, Callable
 
 from pynvim_pp.autocmd import AutoCMD
 from pynvim_pp.logging import log
 from pynvim_pp.rpc import RPC, RpcCallable, RpcMsg
 
+from .scheduler import Scheduler
+
 NAMESPACE = "CHAD"
 
 
@@ -12,7 +13,7 @@ def _name_gen(fn: Callable[[Callable[..., Any]], str]) -> str:
     return fn.__qualname__.lstrip("_").capitalize()
 
 
-event_queue: SimpleQueue = SimpleQueue()
+event_queue = Scheduler()
 autocmd = AutoCMD()
 rpc = RPC(NAMESPACE, name_gen=_name_gen)
 
@@ -0,0 +1,93 @@
+from collections import Counter, deque
+from dataclasses import dataclass
+from threading import Condition
+from time import monotonic
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    MutableMapping,
+    MutableSequence,
+    MutableSet,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from pynvim_pp.rpc import RpcCallable, RpcMsg
+
+Merge = Callable[[Sequence[Any], Sequence[Any]], Sequence[Any]]
+
+
+@dataclass(frozen=True)
+class _Rule:
+    delay: float
+    merge: Optional[Merge]
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._cond = Condition()
+        self._rules: MutableMapping[str, _Rule] = {}
+        self._superseding: MutableSet[str] = set()
+        self._user: Deque[Tuple[int, RpcMsg]] = deque()
+        self._background: MutableSequence[Tuple[float, RpcMsg]] = []
+        self._generation = 0
+        self._serving = 0
+        self.merged: Counter = Counter()
+
+    def background(
+        self, fn: RpcCallable, delay: float = 0, merge: Optional[Merge] = None
+    ) -> None:
+        with self._cond:
+            self._rules[fn.name] = _Rule(delay=delay, merge=merge)
+
+    def supersede(self, fn: RpcCallable) -> None:
+        with self._cond:
+            self._superseding.add(fn.name)
+
+    def cancellation(self) -> Callable[[], bool]:
+        serving = self._serving
+        return lambda: self._generation != serving
+
+    def put(self, msg: RpcMsg) -> None:
+        name, args = msg
+        with self._cond:
+            if name in self._superseding:
+                self._generation += 1
+
+            rule = self._rules.get(name)
+            if not rule:
+                self._user.append((self._generation, msg))
+            else:
+                due = monotonic() + rule.delay
+                for idx, (_, (p_name, p_args)) in enumerate(self._background):
+                    if p_name == name and (rule.merge or p_args == args):
+                        m_args = rule.merge(p_args, args) if rule.merge else p_args
+                        self._background[idx] = (due, (name, m_args))
+                        self.merged[name] += 1
+                        break
+                else:
+                    self._background.append((due, msg))
+            self._cond.notify()
+
+    def get(self) -> RpcMsg:
+        with self._cond:
+            while True:
+                if self._user:
+                    self._serving, msg = self._user.popleft()
+                    return msg
+                else:
+                    now = monotonic()
+                    for idx, (due, msg) in enumerate(self._background):
+                        if due <= now:
+                            self._background.pop(idx)
+                            self._serving = self._generation
+                            return msg
+
+                    timeout = (
+                        min(due for due, _ in self._background) - now
+                        if self._background
+                        else None
+                    )
+                    self._cond.wait(timeout)
@@ -21,10 +21,19 @@ from chad_types import (
 )
 
 from ..consts import CONFIG_YML, SETTINGS_VAR
+from ..fs.glob import compile_glob
 from ..registry import NAMESPACE
 from ..view.load import load_theme
 from ..view.types import HLGroups, Sortby
-from .types import Ignored, MimetypeOptions, Settings, VersionCtlOpts, ViewOptions
+from .types import (
+    Classifiers,
+    Ignored,
+    MimetypeOptions,
+    Settings,
+    VersionCtlOpts,
+    ViewOptions,
+    Workers,
+)
 
 
 class _OpenDirection(Enum):
@@ -37,12 +46,14 @@ class _UserOptions:
     close_on_open: bool
     follow: bool
     lang: Optional[str]
+    listing_limit: int
     mimetypes: MimetypeOptions
     page_increment: int
     polling_rate: SupportsFloat
     session: bool
     show_hidden: bool
     version_control: VersionCtlOpts
+    workers: Workers
 
 
 @dataclass(frozen=True)
@@ -111,6 +122,17 @@ def initial(nvim: Nvim, specs: Sequence[RpcSpec]) -> Settings:
         time_fmt=view.time_format,
     )
 
+    ignore = config.ignore
+    classifiers = Classifiers(
+        ignore_name=compile_glob(
+            ((glob, True) for glob in ignore.name_glob),
+            exact_names=((name, True) for name in ignore.name_exact),
+        ),
+        ignore_path=compile_glob((glob, True) for glob in ignore.path_glob),
+        icon=compile_glob(icons.name_glob.items()),
+        text_hl=compile_glob(hl_context.name_glob.items()),
+    )
+
     keymap = {f"{NAMESPACE}.{k.capitalize()}": v for k, v in config.keymap.items()}
     legal_keys = {f"{NAMESPACE}.{name.capitalize()}" for name, _ in specs}
     extra_keys = keymap.keys() - legal_keys
@@ -125,11 +147,13 @@ def initial(nvim: Nvim, specs: Sequence[RpcSpec]) -> Settings:
 
     else:
         settings = Settings(
+            classifiers=classifiers,
             close_on_open=options.close_on_open,
             follow=options.follow,
             ignores=config.ignore,
             keymap=keymap,
             lang=options.lang,
+            listing_limit=options.listing_limit,
             mime=options.mimetypes,
             open_left=view.open_direction is _OpenDirection.left,
             page_increment=options.page_increment,
@@ -141,6 +165,7 @@ def initial(nvim: Nvim, specs: Sequence[RpcSpec]) -> Settings:
             width=view.width,
             win_actual_opts=win_actual_opts,
             win_local_opts=view.window_options,
+            workers=options.workers,
             xdg=config.xdg,
             profiling=config.profiling,
         )
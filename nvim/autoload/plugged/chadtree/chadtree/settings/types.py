@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import AbstractSet, Mapping, Optional, Union
 
+from ..fs.glob import Glob
 from ..fs.types import Ignored
 from ..view.types import ViewOptions
 
@@ -8,6 +9,7 @@ from ..view.types import ViewOptions
 @dataclass(frozen=True)
 class VersionCtlOpts:
     enable: bool
+    scoped: bool
 
 
 @dataclass(frozen=True)
@@ -16,13 +18,31 @@ class MimetypeOptions:
     allow_exts: AbstractSet[str]
 
 
+@dataclass(frozen=True)
+class Workers:
+    fs: int
+    vc: int
+    ops: int
+    procs: int
+
+
+@dataclass(frozen=True)
+class Classifiers:
+    ignore_name: Glob[bool]
+    ignore_path: Glob[bool]
+    icon: Glob[str]
+    text_hl: Glob[str]
+
+
 @dataclass(frozen=True)
 class Settings:
+    classifiers: Classifiers
     close_on_open: bool
     follow: bool
     ignores: Ignored
     keymap: Mapping[str, AbstractSet[str]]
     lang: Optional[str]
+    listing_limit: int
     mime: MimetypeOptions
     open_left: bool
     page_increment: int
@@ -35,4 +55,5 @@ class Settings:
     width: int
     win_actual_opts: Mapping[str, Union[bool, str]]
     win_local_opts: Mapping[str, Union[bool, str]]
+    workers: Workers
     xdg: bool
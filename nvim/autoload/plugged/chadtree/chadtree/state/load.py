@@ -1,4 +1,6 @@
-from concurrent.futures import Executor
+from atexit import register
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path, PurePath
 
 from pynvim import Nvim
@@ -6,11 +8,12 @@ from pynvim_pp.api import get_cwd
 
 from ..consts import SESSION_DIR
 from ..fs.cartographer import new
+from ..fs.trie import PathSet
 from ..nvim.markers import markers
 from ..settings.types import Settings
 from ..view.render import render
-from .ops import load_session
-from .types import Selection, State, VCStatus
+from .ops import load_session, load_snapshot
+from .types import Lanes, Pages, State, VCStatus
 
 
 def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
@@ -24,7 +27,7 @@ def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
     session = (
         load_session(cwd, session_store=session_store) if settings.session else None
     )
-    index = session.index if session and session.index is not None else {cwd}
+    index = PathSet(session.index if session and session.index is not None else {cwd})
 
     show_hidden = (
         session.show_hidden
@@ -37,8 +40,39 @@ def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
         else settings.version_ctl.enable
     )
 
-    selection: Selection = set()
-    node = new(pool, root=cwd, index=index)
+    selection = PathSet()
+    pages: Pages = {}
+    snapshot = (
+        load_snapshot(cwd, session_store=session_store, index=index)
+        if settings.session
+        else None
+    )
+    workers = settings.workers
+    lanes = Lanes(
+        fs=ThreadPoolExecutor(max_workers=max(1, workers.fs), thread_name_prefix="fs"),
+        vc=ThreadPoolExecutor(max_workers=max(1, workers.vc), thread_name_prefix="vc"),
+        ops=ThreadPoolExecutor(
+            max_workers=max(1, workers.ops), thread_name_prefix="ops"
+        ),
+        procs=(
+            ProcessPoolExecutor(
+                max_workers=workers.procs, mp_context=get_context("spawn")
+            )
+            if workers.procs > 0
+            else None
+        ),
+    )
+    if lanes.procs:
+        register(lanes.procs.shutdown, wait=False)
+    node = snapshot or new(
+        lanes.fs,
+        root=cwd,
+        index=index,
+        settings=settings,
+        pages=pages,
+        show_hidden=show_hidden,
+        procs=lanes.procs,
+    )
     mks = markers(nvim)
     vc = VCStatus()
 
@@ -59,8 +93,11 @@ def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
 
     state = State(
         pool=pool,
+        lanes=lanes,
         session_store=session_store,
         index=index,
+        pages=pages,
+        pending=None,
         selection=selection,
         filter_pattern=filter_pattern,
         show_hidden=show_hidden,
@@ -1,13 +1,30 @@
+from dataclasses import replace
 from pathlib import PurePath
-from typing import AbstractSet, Optional, Union, cast
+from typing import AbstractSet, Callable, Optional, Union
 
 from std2.types import Void, VoidType, or_else
 
 from ..fs.cartographer import update
+from ..fs.trie import PathSet
 from ..fs.types import Node
 from ..settings.types import Settings
 from ..view.render import render
-from .types import FilterPattern, Index, Markers, Selection, State, VCStatus
+from .types import (
+    FilterPattern,
+    Index,
+    Markers,
+    Pages,
+    Selection,
+    State,
+    VCStatus,
+)
+
+
+def _same(prev: PathSet, paths: Union[AbstractSet[PurePath], VoidType]) -> PathSet:
+    if isinstance(paths, VoidType) or paths is prev or paths == prev:
+        return prev
+    else:
+        return PathSet.of(paths)
 
 
 def forward(
@@ -16,6 +33,7 @@ def forward(
     settings: Settings,
     root: Union[Node, VoidType] = Void,
     index: Union[Index, VoidType] = Void,
+    pages: Union[Pages, VoidType] = Void,
     selection: Union[Selection, VoidType] = Void,
     filter_pattern: Union[Optional[FilterPattern], VoidType] = Void,
     show_hidden: Union[bool, VoidType] = Void,
@@ -27,38 +45,36 @@ def forward(
     current: Union[PurePath, VoidType] = Void,
     paths: Union[AbstractSet[PurePath], VoidType] = Void,
 ) -> State:
-    new_index = or_else(index, state.index)
-    new_selection = or_else(selection, state.selection)
+    new_index = _same(state.index, index)
+    new_pages = (
+        state.pages
+        if isinstance(index, VoidType) and isinstance(pages, VoidType)
+        else {
+            path: page
+            for path, page in or_else(pages, state.pages).items()
+            if path in new_index
+        }
+    )
+    new_selection = _same(state.selection, selection)
     new_filter_pattern = or_else(filter_pattern, state.filter_pattern)
     new_current = or_else(current, state.current)
-    new_root = cast(
-        Node,
-        root
-        or (
-            update(state.pool, root=state.root, index=new_index, paths=paths)
-            if not isinstance(paths, VoidType)
-            else state.root
-        ),
+    new_paths = or_else(paths, set())
+    new_root = or_else(root, state.root)
+    pending = (
+        new_paths
+        if not isinstance(root, VoidType)
+        else {*(state.pending or ()), *new_paths}
     )
     new_qf = or_else(markers, state.qf)
     new_vc = or_else(vc, state.vc)
     new_hidden = or_else(show_hidden, state.show_hidden)
-    derived = render(
-        new_root,
-        settings=settings,
-        index=new_index,
-        selection=new_selection,
-        filter_pattern=new_filter_pattern,
-        markers=new_qf,
-        vc=new_vc,
-        show_hidden=new_hidden,
-        current=new_current,
-    )
 
     new_state = State(
         pool=state.pool,
+        lanes=state.lanes,
         session_store=state.session_store,
         index=new_index,
+        pages=new_pages,
         selection=new_selection,
         filter_pattern=new_filter_pattern,
         show_hidden=new_hidden,
@@ -69,7 +85,39 @@ def forward(
         qf=new_qf,
         vc=new_vc,
         current=new_current,
-        derived=derived,
+        derived=state.derived,
+        pending=pending,
     )
 
     return new_state
+
+
+def settle(state: State, *, settings: Settings, cancelled: Callable[[], bool]) -> State:
+    if state.pending is None:
+        return state
+    else:
+        root = update(
+            state.lanes.fs,
+            root=state.root,
+            settings=settings,
+            index=state.index,
+            pages=state.pages,
+            paths=state.pending,
+            show_hidden=state.show_hidden,
+            current=state.current,
+            procs=state.lanes.procs,
+            cancelled=cancelled,
+        )
+        derived = render(
+            root,
+            settings=settings,
+            index=state.index,
+            selection=state.selection,
+            filter_pattern=state.filter_pattern,
+            markers=state.qf,
+            vc=state.vc,
+            show_hidden=state.show_hidden,
+            current=state.current,
+            derived=state.derived,
+        )
+        return replace(state, root=root, derived=derived, pending=None)
@@ -1,12 +1,19 @@
+from concurrent.futures import Future
+from functools import reduce
 from hashlib import sha1
 from json import dumps, loads
+from operator import or_
 from pathlib import Path, PurePath
-from typing import Any, Optional
+from threading import Lock
+from typing import Any, Iterator, MutableMapping, Optional, Sequence, Tuple, cast
 
 from std2.pickle import new_decoder, new_encoder
 
 from ..consts import FOLDER_MODE
-from .types import Session, State
+from ..fs.cartographer import modes
+from ..fs.intern import intern_path
+from ..fs.types import Mode, Node, Signature
+from .types import Index, Session, State
 
 
 def _session_path(cwd: PurePath, session_store: Path) -> Path:
@@ -15,6 +22,10 @@ def _session_path(cwd: PurePath, session_store: Path) -> Path:
     return part.with_suffix(".json")
 
 
+def _snapshot_path(cwd: PurePath, session_store: Path) -> Path:
+    return _session_path(cwd, session_store=session_store).with_suffix(".tree.json")
+
+
 def _load_json(path: Path) -> Optional[Any]:
     if path.exists():
         json = path.read_text("UTF-8")
@@ -38,7 +49,7 @@ def load_session(cwd: PurePath, session_store: Path) -> Session:
 
 def dump_session(state: State, session_store: Path) -> None:
     session = Session(
-        index=state.index, show_hidden=state.show_hidden, enable_vc=state.enable_vc
+        index={*state.index}, show_hidden=state.show_hidden, enable_vc=state.enable_vc
     )
     json = _ENCODER(session)
 
@@ -46,3 +57,77 @@ def dump_session(state: State, session_store: Path) -> None:
     path.parent.mkdir(mode=FOLDER_MODE, parents=True, exist_ok=True)
     json = dumps(json, ensure_ascii=False, check_circular=False, indent=2)
     path.write_text(json, "UTF-8")
+
+
+_Record = Tuple[str, Sequence[str], Optional[Sequence[int]], int]
+
+_SNAPSHOT_LOCK = Lock()
+_SNAPSHOTS: MutableMapping[Path, Node] = {}
+
+
+def _flatten(root: PurePath, node: Node) -> Iterator[_Record]:
+    yield (
+        str(node.path.relative_to(root)),
+        tuple(cast(str, mode.name) for mode in modes(node.mode)),
+        node.signature,
+        node.truncated,
+    )
+    for child in node.children.values():
+        yield from _flatten(root, node=child)
+
+
+def _inflate(root: PurePath, records: Sequence[_Record]) -> Node:
+    acc: MutableMapping[PurePath, Node] = {}
+    for rel, names, signature, truncated in records:
+        path = root / rel
+        node = Node(
+            path=path,
+            id=intern_path(path),
+            mode=reduce(or_, (Mode[name] for name in names), Mode(0)),
+            signature=cast(Signature, (*signature,)) if signature else None,
+            truncated=truncated,
+            children={},
+        )
+        acc[path] = node
+        parent = acc.get(path.parent)
+        if parent and path != root:
+            siblings = cast(MutableMapping[PurePath, Node], parent.children)
+            siblings[path] = node
+
+    return acc[root]
+
+
+def load_snapshot(cwd: PurePath, session_store: Path, index: Index) -> Optional[Node]:
+    load_path = _snapshot_path(cwd, session_store=session_store)
+    try:
+        snapshot = _load_json(load_path)
+        if not snapshot or {*map(PurePath, snapshot["index"])} != index:
+            return None
+        else:
+            return _inflate(cwd, records=snapshot["records"])
+    except Exception:
+        return None
+
+
+def _write_snapshot(path: Path, root: Node, index: Index) -> None:
+    snapshot = {
+        "index": tuple(map(str, index)),
+        "records": tuple(_flatten(root.path, node=root)),
+    }
+    json = dumps(snapshot, ensure_ascii=False, check_circular=False)
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOTS.get(path) is root:
+            path.parent.mkdir(mode=FOLDER_MODE, parents=True, exist_ok=True)
+            path.write_text(json, "UTF-8")
+
+
+def dump_snapshot(state: State, session_store: Path) -> Optional[Future]:
+    root = state.root
+    path = _snapshot_path(root.path, session_store=session_store)
+    if state.pending is None and _SNAPSHOTS.get(path) is not root:
+        _SNAPSHOTS[path] = root
+        return state.lanes.ops.submit(
+            _write_snapshot, path, root=root, index=state.index
+        )
+    else:
+        return None
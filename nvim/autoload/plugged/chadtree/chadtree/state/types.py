@@ -1,8 +1,9 @@
 from concurrent.futures import Executor
 from dataclasses import dataclass
 from pathlib import Path, PurePath
-from typing import AbstractSet, Optional
+from typing import AbstractSet, Mapping, Optional
 
+from ..fs.trie import PathSet
 from ..fs.types import Node
 from ..nvim.types import Markers
 from ..version_ctl.types import VCStatus
@@ -10,6 +11,7 @@ from ..view.types import Derived
 
 Index = AbstractSet[PurePath]
 Selection = Index
+Pages = Mapping[PurePath, int]
 
 
 @dataclass(frozen=True)
@@ -17,19 +19,30 @@ class FilterPattern:
     pattern: str
 
 
+@dataclass(frozen=True)
+class Lanes:
+    fs: Executor
+    vc: Executor
+    ops: Executor
+    procs: Optional[Executor]
+
+
 @dataclass(frozen=True)
 class State:
     pool: Executor
+    lanes: Lanes
     session_store: Path
     current: Optional[PurePath]
     derived: Derived
     enable_vc: bool
     filter_pattern: Optional[FilterPattern]
     follow: bool
-    index: Index
+    index: PathSet
+    pages: Pages
+    pending: Optional[AbstractSet[PurePath]]
     qf: Markers
     root: Node
-    selection: Selection
+    selection: PathSet
     show_hidden: bool
     vc: VCStatus
     width: int
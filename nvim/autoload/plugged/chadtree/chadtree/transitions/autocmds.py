@@ -5,11 +5,12 @@ from pynvim import Nvim
 from pynvim.api.common import NvimError
 from pynvim_pp.api import get_cwd
 
+from ..consts import EVENT_DEBOUNCE, FM_FILETYPE, VIRTUAL_THRESHOLD
 from ..nvim.markers import markers
-from ..registry import NAMESPACE, autocmd, rpc
+from ..registry import NAMESPACE, autocmd, event_queue, rpc
 from ..settings.types import Settings
 from ..state.next import forward
-from ..state.ops import dump_session
+from ..state.ops import dump_session, dump_snapshot
 from ..state.types import State
 from .shared.current import new_current_file, new_root
 from .shared.wm import find_current_buffer_name
@@ -23,9 +24,26 @@ def save_session(nvim: Nvim, state: State, settings: Settings) -> None:
     """
 
     dump_session(state, session_store=state.session_store)
+    dump_snapshot(state, session_store=state.session_store)
 
 
-autocmd("FocusLost", "ExitPre") << f"lua {NAMESPACE}.{save_session.name}()"
+autocmd("FocusLost") << f"lua {NAMESPACE}.{save_session.name}()"
+event_queue.background(save_session)
+
+
+@rpc(blocking=True)
+def save_on_exit(nvim: Nvim, state: State, settings: Settings) -> None:
+    """
+    Save CHADTree state before exit
+    """
+
+    dump_session(state, session_store=state.session_store)
+    written = dump_snapshot(state, session_store=state.session_store)
+    if written:
+        written.result()
+
+
+autocmd("ExitPre") << f"lua {NAMESPACE}.{save_on_exit.name}()"
 
 
 @rpc(blocking=False)
@@ -42,6 +60,7 @@ def _changedir(nvim: Nvim, state: State, settings: Settings) -> Stage:
 
 
 autocmd("DirChanged") << f"lua {NAMESPACE}.{_changedir.name}()"
+event_queue.background(_changedir, delay=EVENT_DEBOUNCE)
 
 
 @rpc(blocking=False)
@@ -62,6 +81,7 @@ def _update_follow(nvim: Nvim, state: State, settings: Settings) -> Optional[Sta
 
 
 autocmd("BufEnter") << f"lua {NAMESPACE}.{_update_follow.name}()"
+event_queue.background(_update_follow, delay=EVENT_DEBOUNCE)
 
 
 @rpc(blocking=False)
@@ -76,3 +96,27 @@ def _update_markers(nvim: Nvim, state: State, settings: Settings) -> Stage:
 
 
 autocmd("QuickfixCmdPost") << f"lua {NAMESPACE}.{_update_markers.name}()"
+event_queue.background(_update_markers, delay=EVENT_DEBOUNCE)
+
+
+@rpc(blocking=False)
+def _fill_virtual(nvim: Nvim, state: State, settings: Settings) -> Optional[Stage]:
+    """
+    Fill in virtualized rows
+    """
+
+    if len(state.derived.lines) <= VIRTUAL_THRESHOLD:
+        return None
+    else:
+        return Stage(state)
+
+
+_PLACEHOLDER_IN_VIEW = (
+    f"vim.bo.filetype == '{FM_FILETYPE}'"
+    " and (vim.fn.getline('w0') == '' or vim.fn.getline('w$') == '')"
+)
+(
+    autocmd("CursorMoved", "WinScrolled")
+    << f"lua if {_PLACEHOLDER_IN_VIEW} then {NAMESPACE}.{_fill_virtual.name}() end"
+)
+event_queue.background(_fill_virtual, delay=EVENT_DEBOUNCE)
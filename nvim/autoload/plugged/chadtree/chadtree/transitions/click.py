@@ -11,7 +11,7 @@ from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.next import forward
 from ..state.types import State
-from .shared.index import indices
+from .shared.index import indices, more_row
 from .shared.open_file import open_file
 from .shared.wm import find_fm_windows
 from .types import ClickType, Stage, State
@@ -20,9 +20,14 @@ from .types import ClickType, Stage, State
 def _click(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool, click_type: ClickType
 ) -> Optional[Stage]:
+    more = more_row(nvim, state=state)
     node = next(indices(nvim, state=state, is_visual=is_visual), None)
 
-    if not node:
+    if more:
+        pages = {**state.pages, more: state.pages.get(more, 1) + 1}
+        new_state = forward(state, settings=settings, pages=pages, paths={more})
+        return Stage(new_state)
+    elif not node:
         return None
     else:
         if Mode.orphan_link in node.mode:
@@ -3,7 +3,6 @@ from typing import Optional
 from pynvim import Nvim
 
 from ..fs.cartographer import is_dir
-from ..fs.ops import ancestors
 from ..registry import rpc
 from ..settings.types import Settings
 from ..state.next import forward
@@ -29,12 +28,7 @@ def _collapse(
         else:
             path = node.path.parent
 
-        paths = {
-            indexed
-            for indexed in state.index
-            if path in (ancestors(indexed) | {indexed})
-        }
-
-        index = (state.index - paths) | {state.root.path}
+        paths = state.index.descendants_of(path)
+        index = state.index.without_prefix(path) | {state.root.path}
         new_state = forward(state, settings=settings, index=index, paths=paths)
         return Stage(new_state, focus=path)
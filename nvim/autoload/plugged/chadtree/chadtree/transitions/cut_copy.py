@@ -105,7 +105,7 @@ def _operation(
                 return None
             else:
                 try:
-                    action(state.pool, operations)
+                    action(state.lanes.ops, operations)
                 except Exception as e:
                     write(nvim, e, error=True)
                     return refresh(nvim, state=state, settings=settings)
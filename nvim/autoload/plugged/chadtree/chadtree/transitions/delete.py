@@ -63,7 +63,7 @@ def _remove(
             return None
         else:
             try:
-                yeet(state.pool, unified)
+                yeet(state.lanes.ops, unified)
             except Exception as e:
                 write(nvim, e, error=True)
                 return refresh(nvim, state=state, settings=settings)
@@ -7,7 +7,7 @@ from pynvim_pp.api import chdir, get_cwd
 from pynvim_pp.lib import write
 
 from ..fs.cartographer import is_dir
-from ..registry import rpc
+from ..registry import event_queue, rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.types import State
@@ -49,6 +49,9 @@ def _refocus(nvim: Nvim, state: State, settings: Settings, is_visual: bool) -> S
     return Stage(new_state, focus=focus)
 
 
+event_queue.supersede(_refocus)
+
+
 @rpc(blocking=False)
 def _change_dir(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool
@@ -70,6 +73,9 @@ def _change_dir(
         return Stage(new_state, focus=new_state.root.path)
 
 
+event_queue.supersede(_change_dir)
+
+
 @rpc(blocking=False)
 def _change_focus(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool
@@ -90,6 +96,9 @@ def _change_focus(
         return Stage(new_state, focus=focus)
 
 
+event_queue.supersede(_change_focus)
+
+
 @rpc(blocking=False)
 def _change_focus_up(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool
@@ -110,3 +119,6 @@ def _change_focus_up(
             indices=set(),
         )
         return Stage(new_state, focus=node.path)
+
+
+event_queue.supersede(_change_focus_up)
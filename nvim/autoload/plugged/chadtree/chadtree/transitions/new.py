@@ -47,9 +47,9 @@ def _new(
             else:
                 try:
                     if child.endswith(sep):
-                        mkdir(state.pool, paths=(path,))
+                        mkdir(state.lanes.ops, paths=(path,))
                     else:
-                        new(state.pool, paths=(path,))
+                        new(state.lanes.ops, paths=(path,))
                 except Exception as e:
                     write(nvim, e, error=True)
                     return refresh(nvim, state=state, settings=settings)
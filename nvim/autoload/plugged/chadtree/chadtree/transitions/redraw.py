@@ -1,94 +1,151 @@
+from itertools import repeat
 from pathlib import PurePath
-from typing import Optional, Sequence
-from uuid import uuid4
+from typing import MutableMapping, MutableSequence, Optional, Sequence, Tuple, TypeVar
 
 from pynvim import Nvim
-from pynvim.api import NvimError
+from pynvim.api import NvimError, Window
 from pynvim.api.buffer import Buffer
-from pynvim_pp.api import buf_get_var, buf_line_count, cur_win, win_get_cursor
+from pynvim_pp.api import buf_line_count, cur_win, win_get_cursor
 from pynvim_pp.atomic import Atomic
 from pynvim_pp.operators import operator_marks
 from std2.difflib import trans_inplace
-from std2.pickle.decoder import new_decoder
-from std2.pickle.types import DecodeError
 
-from ..consts import FM_NAMESPACE
+from ..consts import FM_NAMESPACE, VIRTUAL_MARGIN, VIRTUAL_THRESHOLD
 from ..state.types import State
 from ..view.types import Derived
 from .shared.wm import find_fm_windows
 
-_FM_HASH_VAR = f"CHAD_HASH_{uuid4()}"
+_HASHES: MutableMapping[int, Sequence[str]] = {}
 
 
 class UnrecoverableError(Exception):
     ...
 
 
-_DECODER = new_decoder[Sequence[str]](Sequence[str])
+T = TypeVar("T")
 
 
-def _update(nvim: Nvim, buf: Buffer, ns: int, derived: Derived) -> Atomic:
-    n_hash = derived.hashed
-    try:
-        p_hash: Sequence[str] = _DECODER(buf_get_var(nvim, buf=buf, key=_FM_HASH_VAR))
-    except DecodeError:
-        p_hash = ("",)
+def _virtual(seq: Sequence[T], rows: Tuple[int, int], fill: T) -> Sequence[T]:
+    lo, hi = (min(len(seq), row) for row in rows)
+    return (*repeat(fill, lo), *seq[lo:hi], *repeat(fill, len(seq) - hi))
+
+
+def _update(
+    buf: Buffer,
+    ns: int,
+    derived: Derived,
+    rows: Optional[Tuple[int, int]],
+    p_hash: Sequence[str],
+) -> Tuple[Atomic, Sequence[str]]:
+    if rows:
+        lines = _virtual(derived.lines, rows=rows, fill="")
+        highlights = _virtual(derived.highlights, rows=rows, fill=())
+        badges = _virtual(derived.badges, rows=rows, fill=())
+        n_hash = _virtual(derived.hashed, rows=rows, fill="")
+    else:
+        lines, highlights, badges, n_hash = (
+            derived.lines,
+            derived.highlights,
+            derived.badges,
+            derived.hashed,
+        )
 
     atomic = Atomic()
-    for (i1, i2), (j1, j2) in trans_inplace(src=p_hash, dest=n_hash, unifying=10):
-        atomic.buf_clear_namespace(buf, ns, i1, i2)
-        atomic.buf_set_lines(buf, i1, i2, True, derived.lines[j1:j2])
+    if n_hash != p_hash:
+        for (i1, i2), (j1, j2) in trans_inplace(src=p_hash, dest=n_hash, unifying=10):
+            atomic.buf_clear_namespace(buf, ns, i1, i2)
+            atomic.buf_set_lines(buf, i1, i2, True, lines[j1:j2])
+
+            for idx, hls in enumerate(highlights[j1:j2], start=i1):
+                for hl in hls:
+                    atomic.buf_add_highlight(buf, ns, hl.group, idx, hl.begin, hl.end)
 
-        for idx, highlights in enumerate(derived.highlights[j1:j2], start=i1):
-            for hl in highlights:
-                atomic.buf_add_highlight(buf, ns, hl.group, idx, hl.begin, hl.end)
+            for idx, bdgs in enumerate(badges[j1:j2], start=i1):
+                vtxt = tuple((bdg.text, bdg.group) for bdg in bdgs)
+                atomic.buf_set_virtual_text(buf, ns, idx, vtxt, {})
 
-        for idx, badges in enumerate(derived.badges[j1:j2], start=i1):
-            vtxt = tuple((bdg.text, bdg.group) for bdg in badges)
-            atomic.buf_set_virtual_text(buf, ns, idx, vtxt, {})
+    return atomic, n_hash
 
-    atomic.buf_set_var(buf, _FM_HASH_VAR, n_hash)
-    return atomic
+
+def _span(rows: Optional[Tuple[int, int]], other: Tuple[int, int]) -> Tuple[int, int]:
+    if rows:
+        (lo, hi), (o_lo, o_hi) = rows, other
+        return min(lo, o_lo), max(hi, o_hi)
+    else:
+        return other
 
 
 def redraw(nvim: Nvim, state: State, focus: Optional[PurePath]) -> None:
     derived, current = state.derived, state.current
     focus_row = derived.path_row_lookup.get(focus) if focus else None
     current_row = derived.path_row_lookup.get(current) if current else None
+    n_count = len(derived.lines)
 
     cwin = cur_win(nvim)
     ns = nvim.api.create_namespace(FM_NAMESPACE)
 
+    bufs: MutableMapping[Buffer, MutableSequence[Window]] = {}
     for win, buf in find_fm_windows(nvim):
-        p_count = buf_line_count(nvim, buf=buf)
-        n_count = len(state.derived.lines)
-        row, col = win_get_cursor(nvim, win=win)
-        (r1, c1), (r2, c2) = operator_marks(nvim, buf=buf, visual_type=None)
-
-        if focus_row is not None:
-            new_row: Optional[int] = focus_row + 1
-        elif win != cwin and current_row is not None:
-            new_row = current_row + 1
-        elif row >= n_count:
-            new_row = n_count
-        elif p_count != n_count:
-            new_row = row + 1
-        else:
-            new_row = None
-
-        a1 = Atomic()
-        a1.buf_set_option(buf, "modifiable", True)
-
-        a2 = _update(nvim, buf=buf, ns=ns, derived=derived)
+        bufs.setdefault(buf, []).append(win)
 
-        a3 = Atomic()
-        a3.buf_set_option(buf, "modifiable", False)
-        a3.call_function("setpos", ("'<", (buf.number, r1 + 1, c1 + 1, 0)))
-        a3.call_function("setpos", ("'>", (buf.number, r2 + 1, c2 + 1, 0)))
-        if new_row is not None:
-            a3.win_set_cursor(win, (new_row, col))
+    for number in _HASHES.keys() - {buf.number for buf in bufs}:
+        _HASHES.pop(number, None)
 
-        try:
-            (a1 + a2 + a3).commit(nvim)
-        except NvimError as e:
-            raise UnrecoverableError(e)
+    for buf, wins in bufs.items():
+        p_count = buf_line_count(nvim, buf=buf)
+        p_hash = _HASHES.get(buf.number, ("",))
+        if len(p_hash) != p_count:
+            p_hash = ("",)
+
+        cursors, moved = Atomic(), False
+        rows: Optional[Tuple[int, int]] = None
+        for win in wins:
+            row, col = win_get_cursor(nvim, win=win)
+
+            if focus_row is not None:
+                new_row: Optional[int] = focus_row + 1
+            elif win != cwin and current_row is not None:
+                new_row = current_row + 1
+            elif row >= n_count:
+                new_row = n_count
+            elif p_count != n_count:
+                new_row = row + 1
+            else:
+                new_row = None
+
+            if n_count > VIRTUAL_THRESHOLD:
+                center = row if new_row is None else new_row - 1
+                span = nvim.api.win_get_height(win) + VIRTUAL_MARGIN
+                rows = _span(rows, (max(0, center - span), center + span + 1))
+
+            if new_row is not None:
+                moved = True
+                cursors.win_set_cursor(win, (new_row, col))
+
+        a2, n_hash = _update(buf=buf, ns=ns, derived=derived, rows=rows, p_hash=p_hash)
+
+        if n_hash != p_hash:
+            (r1, c1), (r2, c2) = operator_marks(nvim, buf=buf, visual_type=None)
+
+            a1 = Atomic()
+            a1.buf_set_option(buf, "modifiable", True)
+
+            a3 = Atomic()
+            a3.buf_set_option(buf, "modifiable", False)
+            a3.call_function("setpos", ("'<", (buf.number, r1 + 1, c1 + 1, 0)))
+            a3.call_function("setpos", ("'>", (buf.number, r2 + 1, c2 + 1, 0)))
+
+            atomic: Optional[Atomic] = a1 + a2 + a3 + cursors
+        elif moved:
+            atomic = cursors
+        else:
+            atomic = None
+
+        if atomic is not None:
+            try:
+                atomic.commit(nvim)
+            except NvimError as e:
+                _HASHES.pop(buf.number, None)
+                raise UnrecoverableError(e)
+            else:
+                _HASHES[buf.number] = n_hash
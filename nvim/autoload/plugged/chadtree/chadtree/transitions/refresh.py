@@ -1,6 +1,3 @@
-from contextlib import contextmanager
-from typing import Iterator
-
 from pynvim import Nvim
 from pynvim_pp.lib import write
 
@@ -8,20 +5,16 @@ from ..registry import rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.types import State
+from ..version_ctl.git import invalidate
 from .shared.refresh import refresh as _refresh
 from .types import Stage
 from .version_ctl import vc_refresh
 
 
-@contextmanager
-def with_manual(nvim: Nvim) -> Iterator[None]:
-    write(nvim, LANG("hourglass"))
-    yield None
-    write(nvim, LANG("ok_sym"))
-
-
 @rpc(blocking=False)
 def refresh(nvim: Nvim, state: State, settings: Settings, is_visual: bool) -> Stage:
+    invalidate()
     vc_refresh(nvim, state=state, settings=settings)
-    with with_manual(nvim):
-        return _refresh(nvim, state=state, settings=settings)
+    write(nvim, LANG("hourglass"))
+    stage = _refresh(nvim, state=state, settings=settings, force=True)
+    return Stage(stage.state, focus=stage.focus, message=LANG("ok_sym"))
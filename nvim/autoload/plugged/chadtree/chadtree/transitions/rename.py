@@ -44,7 +44,7 @@ def _rename(
                 return None
             else:
                 try:
-                    rename(state.pool, operations=operations)
+                    rename(state.lanes.ops, operations=operations)
                 except Exception as e:
                     write(nvim, e, error=True)
                     return refresh(nvim, state=state, settings=settings)
@@ -55,7 +55,7 @@ def _rename(
                         )
                         or state
                     )
-                    paths = ancestors(new_path)
+                    paths = ancestors(new_path) | {node.path.parent}
                     index = state.index | paths
                     next_state = forward(
                         new_state, settings=settings, index=index, paths=paths
@@ -1,19 +1,55 @@
-from typing import Optional
+from pathlib import PurePath
+from typing import AbstractSet, Any, Optional, Sequence
 
 from pynvim import Nvim
 from pynvim.api.common import NvimError
 
-from ..registry import rpc
+from ..fs.ops import exists
+from ..registry import event_queue, rpc
 from ..settings.types import Settings
+from ..state.next import forward
 from ..state.types import State
 from .shared.refresh import refresh
 from .types import Stage
 
 
 @rpc(blocking=False)
-def schedule_update(nvim: Nvim, state: State, settings: Settings) -> Optional[Stage]:
+def schedule_update(
+    nvim: Nvim, state: State, settings: Settings, force: bool = False
+) -> Optional[Stage]:
     try:
-        stage = refresh(nvim, state=state, settings=settings)
+        stage = refresh(nvim, state=state, settings=settings, force=force)
         return Stage(stage.state, focus=stage.focus)
     except NvimError:
         return None
+
+
+event_queue.background(schedule_update)
+
+
+@rpc(blocking=False)
+def fs_update(
+    nvim: Nvim, state: State, settings: Settings, paths: AbstractSet[PurePath]
+) -> Stage:
+    """
+    Relist directories reported by the fs watcher
+    """
+
+    index = state.index.prune(
+        lambda path: path.parent not in paths or exists(path, follow=True)
+    )
+    selection = state.selection.prune(
+        lambda path: path.parent not in paths or exists(path, follow=False)
+    )
+    new_state = forward(
+        state, settings=settings, index=index, selection=selection, paths=paths
+    )
+    return Stage(new_state)
+
+
+def _union(prev: Sequence[Any], args: Sequence[Any]) -> Sequence[Any]:
+    (p_paths,), (paths,) = prev, args
+    return ({*p_paths, *paths},)
+
+
+event_queue.background(fs_update, merge=_union)
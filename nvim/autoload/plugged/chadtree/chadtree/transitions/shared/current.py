@@ -4,7 +4,7 @@ from typing import AbstractSet, Optional
 from pynvim import Nvim
 from std2.pathlib import is_relative_to, longest_common_path
 
-from ...fs.cartographer import new
+from ...fs.cartographer import stub, truncated
 from ...fs.ops import ancestors
 from ...settings.types import Settings
 from ...state.next import forward
@@ -21,8 +21,9 @@ def new_current_file(
 
     parents = ancestors(current)
     if state.root.path in parents:
-        paths: AbstractSet[PurePath] = parents if state.follow else set()
-        index = state.index | paths
+        opened: AbstractSet[PurePath] = parents - state.index if state.follow else set()
+        index = state.index | opened
+        paths = opened | truncated(state.root, paths=parents & state.index)
         new_state = forward(
             state, settings=settings, index=index, paths=paths, current=current
         )
@@ -38,11 +39,16 @@ def new_root(
     new_cwd: PurePath,
     indices: AbstractSet[PurePath],
 ) -> State:
-    index = state.index | ancestors(new_cwd) | {new_cwd} | indices
-    root = new(state.pool, root=new_cwd, index=index)
-    selection = {path for path in state.selection if root.path in ancestors(path)}
+    cwd = PurePath(new_cwd)
+    index = state.index | ancestors(cwd) | {cwd} | indices
+    selection = state.selection.descendants_of(cwd) - {cwd}
     return forward(
-        state, settings=settings, root=root, selection=selection, index=index
+        state,
+        settings=settings,
+        root=stub(cwd),
+        selection=selection,
+        index=index,
+        paths={cwd},
     )
 
 
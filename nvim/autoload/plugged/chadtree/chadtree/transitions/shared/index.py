@@ -1,3 +1,4 @@
+from pathlib import PurePath
 from typing import Iterator, Optional
 
 from pynvim.api import Nvim
@@ -16,6 +17,17 @@ def _row_index(state: State, row: int) -> Optional[Node]:
         return None
 
 
+def more_row(nvim: Nvim, state: State) -> Optional[PurePath]:
+    win = cur_win(nvim)
+    buf = win_get_buf(nvim, win=win)
+
+    if not is_fm_buffer(nvim, buf=buf):
+        return None
+    else:
+        row, _ = win_get_cursor(nvim, win=win)
+        return state.derived.more_row_lookup.get(row)
+
+
 def indices(nvim: Nvim, state: State, is_visual: bool) -> Iterator[Node]:
     win = cur_win(nvim)
     buf = win_get_buf(nvim, win=win)
@@ -1,10 +1,12 @@
 from pathlib import PurePath
-from typing import AbstractSet, Optional
+from typing import AbstractSet, Optional, Union
 
 from pynvim import Nvim
-from std2.types import Void
+from std2.types import Void, VoidType
 
+from ...fs.cartographer import outdated, signatures, stub
 from ...fs.ops import ancestors, exists
+from ...fs.types import Node
 from ...nvim.markers import markers
 from ...settings.types import Settings
 from ...state.next import forward
@@ -15,27 +17,37 @@ from ..types import Stage
 
 
 def refresh(
-    nvim: Nvim, state: State, settings: Settings, vc: Optional[VCStatus] = None
+    nvim: Nvim,
+    state: State,
+    settings: Settings,
+    vc: Optional[VCStatus] = None,
+    force: bool = False,
 ) -> Stage:
     current = find_current_buffer_name(nvim)
     cwd = state.root.path
-    paths = {cwd}
     new_current = current if cwd in ancestors(current) else None
 
-    index = {path for path in state.index if exists(path, follow=True)} | paths
-    selection = {s for s in state.selection if exists(s, follow=False)}
+    sigs = signatures(state.lanes.fs, paths=state.index | {cwd})
+    index = {path for path, sig in sigs.items() if sig} | {cwd}
+    selection = state.selection.prune(lambda path: exists(path, follow=False))
     parent_paths: AbstractSet[PurePath] = ancestors(current) if state.follow else set()
     new_index = index if new_current else index | parent_paths
+    if force:
+        root: Union[Node, VoidType] = stub(cwd)
+        paths: AbstractSet[PurePath] = {cwd}
+    else:
+        root, paths = Void, outdated(state.root, index=new_index, sigs=sigs)
 
     mks = markers(nvim)
     new_state = forward(
         state,
         settings=settings,
+        root=root,
         index=new_index,
         selection=selection,
         markers=mks,
-        paths=paths,
         current=new_current or Void,
+        paths=paths,
     )
 
     return Stage(new_state)
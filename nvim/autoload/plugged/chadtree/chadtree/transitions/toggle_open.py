@@ -150,7 +150,7 @@ def _open(
                 else PurePath(get_cwd(nvim)) / opts.path
             )
             if not exists(path, follow=True):
-                new(state.pool, paths=(path,))
+                new(state.lanes.ops, paths=(path,))
             next_state = (
                 maybe_path_above(nvim, state=new_state, settings=settings, path=path)
                 or new_state
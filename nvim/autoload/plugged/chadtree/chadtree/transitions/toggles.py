@@ -4,6 +4,7 @@ from pynvim import Nvim
 from pynvim_pp.lib import write
 from std2.types import Void, VoidType
 
+from ..fs.cartographer import truncated
 from ..registry import rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
@@ -29,8 +30,13 @@ def _toggle_hidden(
         focus = node.path
         show_hidden = not state.show_hidden
         selection: Selection = state.selection if show_hidden else set()
+        paths = truncated(state.root, paths=state.index)
         new_state = forward(
-            state, settings=settings, show_hidden=show_hidden, selection=selection
+            state,
+            settings=settings,
+            show_hidden=show_hidden,
+            selection=selection,
+            paths=paths,
         )
         return Stage(new_state, focus=focus)
 
@@ -18,3 +18,4 @@ class ClickType(Enum):
 class Stage:
     state: State
     focus: Optional[PurePath] = None
+    message: Optional[str] = None
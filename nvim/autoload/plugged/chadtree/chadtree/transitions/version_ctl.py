@@ -5,11 +5,11 @@ from pynvim import Nvim
 from pynvim_pp.api import get_cwd
 from pynvim_pp.logging import log
 
-from ..registry import enqueue_event, rpc
+from ..registry import NAMESPACE, autocmd, enqueue_event, event_queue, rpc
 from ..settings.types import Settings
 from ..state.next import forward
 from ..state.types import State
-from ..version_ctl.git import status
+from ..version_ctl.git import invalidate, status
 from ..version_ctl.types import VCStatus
 from .types import Stage
 
@@ -22,6 +22,9 @@ def _set_vc(nvim: Nvim, state: State, settings: Settings, vc: VCStatus) -> Stage
     return Stage(new_state)
 
 
+event_queue.background(_set_vc, merge=lambda _, args: args)
+
+
 @rpc(blocking=False)
 def vc_refresh(nvim: Nvim, state: State, settings: Settings) -> None:
     """
@@ -30,6 +33,7 @@ def vc_refresh(nvim: Nvim, state: State, settings: Settings) -> None:
 
     if state.enable_vc:
         cwd = PurePath(get_cwd(nvim))
+        cancelled = event_queue.cancellation()
 
         def cont() -> None:
             if _lock.locked():
@@ -37,10 +41,35 @@ def vc_refresh(nvim: Nvim, state: State, settings: Settings) -> None:
             else:
                 with _lock:
                     try:
-                        vc = status(state.pool, cwd=cwd)
+                        vc = status(
+                            state.lanes.vc,
+                            cwd=cwd,
+                            paths=state.index,
+                            scoped=settings.version_ctl.scoped,
+                        )
                     except Exception as e:
                         log.exception("%s", e)
                     else:
-                        enqueue_event(_set_vc, vc)
+                        if cancelled():
+                            enqueue_event(vc_refresh)
+                        else:
+                            enqueue_event(_set_vc, vc)
 
         state.pool.submit(cont)
+
+
+event_queue.background(vc_refresh)
+
+
+@rpc(blocking=False)
+def _vc_written(nvim: Nvim, state: State, settings: Settings) -> None:
+    """
+    Invalidate VC cache
+    """
+
+    invalidate()
+    enqueue_event(vc_refresh)
+
+
+autocmd("BufWritePost") << f"lua {NAMESPACE}.{_vc_written.name}()"
+event_queue.background(_vc_written)
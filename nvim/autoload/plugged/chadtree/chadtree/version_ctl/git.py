@@ -1,25 +1,35 @@
-from concurrent.futures import Executor, Future, wait
-from itertools import chain
+from collections import Counter
+from concurrent.futures import Executor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
 from locale import strxfrm
-from os import environ, linesep, sep
-from pathlib import PurePath
+from os import environ, fsdecode, scandir
+from os import stat as fs_stat
+from pathlib import Path, PurePath
 from shutil import which
 from string import whitespace
 from subprocess import DEVNULL, PIPE, CalledProcessError, check_output
+from threading import Lock
+from time import monotonic
 from typing import (
+    AbstractSet,
+    Any,
+    FrozenSet,
     Iterable,
     Iterator,
     MutableMapping,
-    MutableSequence,
     MutableSet,
+    Optional,
     Sequence,
     Tuple,
-    cast,
 )
 
-from std2.string import removeprefix, removesuffix
+from std2.pathlib import is_relative_to
+from std2.string import removeprefix
 
-from ..fs.ops import ancestors
+from ..consts import VC_CACHE_TTL
+from ..fs.intern import intern_path
+from ..fs.types import Signature
 from .types import VCStatus
 
 _WHITE_SPACES = {*whitespace}
@@ -32,13 +42,52 @@ _GIT_LIST_CMD = (
     "--porcelain",
     "-z",
 )
+_GIT_SCOPED_LIST_CMD = (
+    "git",
+    "--no-optional-locks",
+    "status",
+    "--ignored=matching",
+    "--renames",
+    "--porcelain",
+    "-z",
+)
+_GIT_SUBMODULE_LIST_CMD = (
+    "git",
+    "config",
+    "--file",
+    ".gitmodules",
+    "-z",
+    "--get-regexp",
+)
 _GIT_ENV = {"LC_ALL": "C"}
 
-_GIT_SUBMODULE_MARKER = "Entering "
 _SUBMODULE_MARKER = "S"
 _IGNORED_MARKER = "I"
 _UNTRACKED_MARKER = "?"
 
+_Fingerprint = Tuple[Optional[Signature], ...]
+_Trie = MutableMapping[str, Any]
+_OWN = ""
+
+
+@dataclass(frozen=True)
+class _Entry:
+    due: float
+    expanded: Optional[AbstractSet[PurePath]]
+    fingerprint: _Fingerprint
+    vc: VCStatus
+
+
+class _Cache:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.epoch = 0
+        self.entries: MutableMapping[PurePath, _Entry] = {}
+
+
+_CACHE = _Cache()
+cache_stats: Counter = Counter()
+
 
 def root(cwd: PurePath) -> PurePath:
     stdout = check_output(
@@ -50,75 +99,55 @@ def root(cwd: PurePath) -> PurePath:
     return PurePath(stdout.rstrip())
 
 
-def _stat_main(cwd: str) -> Sequence[Tuple[str, PurePath]]:
-    stdout = check_output(_GIT_LIST_CMD, stdin=DEVNULL, stderr=PIPE, text=True, cwd=cwd)
+def _porcelain(stdout: bytes, prefix: PurePath) -> Iterator[Tuple[str, PurePath]]:
+    it = iter(stdout.split(b"\0"))
+    for line in it:
+        if line:
+            stat = line[:2].decode()
+            yield stat, prefix / fsdecode(line[3:])
 
-    def cont() -> Iterator[Tuple[str, PurePath]]:
-        it = iter(stdout.split("\0"))
-        for line in it:
-            prefix, file = line[:2], line[3:]
-            yield prefix, PurePath(file)
-
-            if "R" in prefix:
+            if "R" in stat:
                 next(it, None)
 
-    return tuple(cont())
+
+def _stat_main(cwd: PurePath, scoped: bool) -> Sequence[Tuple[str, PurePath]]:
+    cmd = (*_GIT_SCOPED_LIST_CMD, "--", ".") if scoped else _GIT_LIST_CMD
+    stdout = check_output(cmd, stdin=DEVNULL, stderr=PIPE, cwd=cwd)
+    return tuple(_porcelain(stdout, prefix=PurePath()))
 
 
-def _stat_sub_modules(cwd: PurePath) -> Sequence[Tuple[str, PurePath]]:
+def _sub_modules(top: PurePath, base: PurePath) -> Iterator[PurePath]:
+    if Path(top, ".gitmodules").is_file():
+        try:
+            stdout = check_output(
+                (*_GIT_SUBMODULE_LIST_CMD, r"^submodule\..*\.path$"),
+                stdin=DEVNULL,
+                stderr=PIPE,
+                cwd=top,
+            )
+        except CalledProcessError:
+            pass
+        else:
+            for line in stdout.split(b"\0"):
+                _, _, name = line.partition(b"\n")
+                if name:
+                    rel = PurePath(fsdecode(name))
+                    if Path(top, rel, ".git").exists():
+                        yield base / rel
+                        yield from _sub_modules(top / rel, base=base / rel)
+
+
+def _stat_sub_module(
+    top: PurePath, sub_module: PurePath, scoped: bool
+) -> Sequence[Tuple[str, PurePath]]:
     stdout = check_output(
-        (
-            "git",
-            "submodule",
-            "foreach",
-            "--recursive",
-            *_GIT_LIST_CMD,
-        ),
+        _GIT_SCOPED_LIST_CMD if scoped else _GIT_LIST_CMD,
         env={**environ, **_GIT_ENV},
         stdin=DEVNULL,
         stderr=PIPE,
-        text=True,
-        cwd=cwd,
+        cwd=top / sub_module,
     )
-
-    def cont() -> Iterator[Tuple[str, PurePath]]:
-        it = iter(stdout)
-        sub_module = PurePath(sep)
-        acc: MutableSequence[str] = []
-
-        for char in it:
-            if char == linesep:
-                line = "".join(acc)
-                acc.clear()
-
-                if not line.startswith(_GIT_SUBMODULE_MARKER):
-                    raise ValueError(stdout)
-                else:
-                    quoted = removeprefix(line, prefix=_GIT_SUBMODULE_MARKER)
-                    if not (quoted.startswith("'") and quoted.endswith("'")):
-                        raise ValueError(stdout)
-                    else:
-                        sub_module = PurePath(
-                            removesuffix(removeprefix(quoted, prefix="'"), suffix="'")
-                        )
-                        yield _SUBMODULE_MARKER, sub_module
-
-            elif char == "\0":
-                line = "".join(acc)
-                acc.clear()
-
-                if not sub_module:
-                    raise ValueError(stdout)
-                else:
-                    prefix, file = line[:2], line[3:]
-                    yield prefix, sub_module / file
-
-                    if "R" in prefix:
-                        next(it, None)
-            else:
-                acc.append(char)
-
-    return tuple(cont())
+    return tuple(_porcelain(stdout, prefix=sub_module))
 
 
 def _stat_name(stat: str) -> str:
@@ -129,44 +158,255 @@ def _stat_name(stat: str) -> str:
     return markers.get(stat, stat)
 
 
-def _parse(root: PurePath, stats: Iterable[Tuple[str, PurePath]]) -> VCStatus:
-    above = ancestors(root)
+def _expanded(
+    root: PurePath, expanded: Optional[AbstractSet[PurePath]]
+) -> Optional[_Trie]:
+    if expanded is None:
+        return None
+    else:
+        trie: _Trie = {}
+        for path in expanded:
+            if is_relative_to(path, root):
+                node = trie
+                for part in path.relative_to(root).parts:
+                    node = node.setdefault(part, {})
+                node[_OWN] = True
+        return trie
+
+
+def _shown(expanded: Optional[_Trie], parts: Sequence[str]) -> bool:
+    node = expanded
+    for part in parts:
+        if node is None:
+            break
+        else:
+            node = node.get(part)
+    return expanded is None or bool(node and _OWN in node)
+
+
+def _descend(trie: _Trie, expanded: Optional[_Trie], parts: Sequence[str]) -> _Trie:
+    node, exp, prev = trie, expanded, False
+    for part in parts:
+        shown = expanded is None or bool(exp and _OWN in exp)
+        node = node.setdefault(part, {})
+        if prev and not shown:
+            break
+        else:
+            exp, prev = exp.get(part) if exp else None, shown
+    return node
+
+
+@lru_cache(maxsize=None)
+def _consolidate(symbols: FrozenSet[str]) -> str:
+    return "".join(sorted(symbols, key=strxfrm))
+
+
+def _aggregate(
+    root: PurePath,
+    trie: _Trie,
+    expanded: Optional[_Trie],
+    parts: Tuple[str, ...],
+    visible: bool,
+    status: MutableMapping[PurePath, str],
+) -> FrozenSet[str]:
+    shown = expanded is None or _OWN in expanded
+    below: FrozenSet[str] = frozenset()
+    for part, sub in trie.items():
+        if part != _OWN:
+            exp = None if expanded is None else expanded.get(part, {})
+            below |= _aggregate(
+                root,
+                trie=sub,
+                expanded=exp,
+                parts=(*parts, part),
+                visible=shown,
+                status=status,
+            )
+
+    if len(trie) > (_OWN in trie) and (visible or shown):
+        path = root.joinpath(*parts)
+        pre_existing = frozenset(status.get(path, ""))
+        status[path] = _consolidate(pre_existing | below - _WHITE_SPACES)
+
+    own: FrozenSet[str] = trie.get(_OWN, frozenset())
+    return below | own
+
+
+def _parse(
+    root: PurePath,
+    stats: Iterable[Tuple[str, PurePath]],
+    expanded: Optional[AbstractSet[PurePath]],
+) -> VCStatus:
+    exp = _expanded(root, expanded=expanded)
+    trie: _Trie = {}
     ignored: MutableSet[PurePath] = set()
     status: MutableMapping[PurePath, str] = {}
-    directories: MutableMapping[PurePath, MutableSet[str]] = {}
 
     for stat, name in stats:
-        path = root / name
-        status[path] = _stat_name(stat)
+        parts = name.parts
         if "!" in stat:
-            ignored.add(path)
+            if _shown(exp, parts=parts[:-1]):
+                path = root / name
+                status[path] = _stat_name(stat)
+                ignored.add(path)
+        else:
+            if _shown(exp, parts=parts[:-1]):
+                status[root / name] = _stat_name(stat)
+            node = _descend(trie, expanded=exp, parts=parts)
+            if stat != _SUBMODULE_MARKER:
+                node[_OWN] = node.get(_OWN, frozenset()) | {*stat}
+
+    _aggregate(root, trie=trie, expanded=exp, parts=(), visible=False, status=status)
+    return VCStatus(
+        ignored={*map(intern_path, ignored)},
+        status={intern_path(path): stat for path, stat in status.items()},
+    )
+
+
+def _sig(path: PurePath) -> Optional[Signature]:
+    try:
+        info = fs_stat(path)
+    except OSError:
+        return None
+    else:
+        return info.st_mtime_ns, info.st_ino, info.st_size
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text("UTF-8").strip()
+    except (OSError, UnicodeDecodeError):
+        return ""
+
+
+def _git_dir(cwd: PurePath) -> Optional[Path]:
+    for parent in (cwd, *cwd.parents):
+        dot = Path(parent) / ".git"
+        if dot.is_dir():
+            return dot
+        elif dot.is_file():
+            line = _read(dot)
+            if line.startswith("gitdir:"):
+                return Path(parent, removeprefix(line, prefix="gitdir:").strip())
+            else:
+                return None
+    return None
+
+
+def _sub_git_dirs(git_dir: Path) -> Iterator[Path]:
+    stack = [git_dir / "modules"]
+    while stack:
+        try:
+            entries = tuple(scandir(stack.pop()))
+        except OSError:
+            pass
         else:
-            for ancestor in ancestors(path):
-                parents = directories.setdefault(ancestor, set())
-                if stat != _SUBMODULE_MARKER:
-                    for sym in stat:
-                        parents.add(sym)
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    path = Path(entry.path)
+                    if (path / "HEAD").is_file():
+                        yield path
+                        stack.append(path / "modules")
+                    else:
+                        stack.append(path)
+
+
+def _meta(git_dir: Path) -> Iterator[Optional[Signature]]:
+    common = _read(git_dir / "commondir")
+    common_dir = git_dir / common if common else git_dir
+    head = _read(git_dir / "HEAD")
+
+    yield _sig(git_dir / "index")
+    yield _sig(git_dir / "HEAD")
+    yield _sig(common_dir / "packed-refs")
+    yield _sig(common_dir / "info" / "exclude")
+    if head.startswith("ref:"):
+        yield _sig(common_dir / removeprefix(head, prefix="ref:").strip())
+
 
-    for directory, syms in directories.items():
-        pre_existing = {*status.get(directory, "")}
-        symbols = pre_existing | syms - _WHITE_SPACES
-        consoildated = sorted(symbols, key=strxfrm)
-        status[directory] = "".join(consoildated)
+def _fingerprint(cwd: PurePath, paths: AbstractSet[PurePath]) -> Optional[_Fingerprint]:
+    git_dir = _git_dir(cwd)
+    if not git_dir:
+        return None
+    else:
+
+        def cont() -> Iterator[Optional[Signature]]:
+            for gd in (git_dir, *_sub_git_dirs(git_dir)):
+                yield from _meta(gd)
+            for path in sorted({cwd, *paths}):
+                yield _sig(path)
+                yield _sig(path / ".gitignore")
+
+        return tuple(cont())
 
-    trimmed = {path: stat for path, stat in status.items() if path not in above}
-    return VCStatus(ignored=ignored, status=trimmed)
 
+def invalidate() -> None:
+    with _CACHE.lock:
+        _CACHE.epoch += 1
+        _CACHE.entries.clear()
 
-def status(pool: Executor, cwd: PurePath) -> VCStatus:
+
+def _status(
+    pool: Executor, cwd: PurePath, expanded: Optional[AbstractSet[PurePath]]
+) -> VCStatus:
     if which("git"):
         try:
-            r = pool.submit(root, cwd=cwd)
-            s_main = pool.submit(_stat_main, cwd=cwd)
-            s_sub = pool.submit(_stat_sub_modules, cwd=cwd)
+            scoped = expanded is not None
+            s_main = pool.submit(_stat_main, cwd=cwd, scoped=scoped)
+            top = root(cwd)
+            sub_modules = tuple(
+                sub_module
+                for sub_module in _sub_modules(top, base=PurePath())
+                if not scoped or is_relative_to(top / sub_module, cwd)
+            )
+            s_subs = tuple(
+                pool.submit(_stat_sub_module, top, sub_module=sub_module, scoped=scoped)
+                for sub_module in sub_modules
+            )
+
+            def cont() -> Iterator[Tuple[str, PurePath]]:
+                yield from s_main.result()
+                for fut in as_completed(s_subs):
+                    yield from fut.result()
+                for sub_module in sub_modules:
+                    yield _SUBMODULE_MARKER, sub_module
 
-            wait(cast(Sequence[Future], (r, s_main, s_sub)))
-            return _parse(r.result(), stats=chain(s_main.result(), s_sub.result()))
+            return _parse(top, stats=cont(), expanded=expanded)
         except CalledProcessError:
             return VCStatus()
     else:
         return VCStatus()
+
+
+def status(
+    pool: Executor, cwd: PurePath, paths: AbstractSet[PurePath], scoped: bool
+) -> VCStatus:
+    with _CACHE.lock:
+        epoch, entry = _CACHE.epoch, _CACHE.entries.get(cwd)
+
+    now = monotonic()
+    expanded = frozenset((cwd, *paths)) if scoped else None
+    fingerprint = _fingerprint(cwd, paths=paths)
+    if (
+        fingerprint is not None
+        and entry
+        and entry.due > now
+        and entry.expanded == expanded
+        and entry.fingerprint == fingerprint
+    ):
+        cache_stats["hit"] += 1
+        return entry.vc
+    else:
+        cache_stats["miss"] += 1
+        vc = _status(pool, cwd=cwd, expanded=expanded)
+        if fingerprint is not None:
+            new_entry = _Entry(
+                due=now + VC_CACHE_TTL,
+                expanded=expanded,
+                fingerprint=fingerprint,
+                vc=vc,
+            )
+            with _CACHE.lock:
+                if _CACHE.epoch == epoch:
+                    _CACHE.entries[cwd] = new_entry
+        return vc
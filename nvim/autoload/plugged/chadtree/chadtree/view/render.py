@@ -1,50 +1,67 @@
-from enum import IntEnum, auto
 from fnmatch import fnmatch
-from locale import strxfrm
 from os import linesep
 from os.path import sep
 from pathlib import PurePath
-from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, cast
-
-from std2.types import never
-
-from ..fs.cartographer import is_dir, user_ignored
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+from ..consts import DECORATION_CACHE_SIZE
+from ..fs.cartographer import (
+    is_dir,
+    modes,
+    perm_bits,
+    sort_key,
+    stat_perms,
+    user_ignored,
+)
+from ..fs.glob import glob_index
+from ..fs.intern import intern_path, path_of
+from ..fs.ops import ancestors
 from ..fs.types import Mode, Node
+from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.types import FilterPattern, Index, Markers, Selection
 from ..version_ctl.types import VCStatus
-from .types import Badge, Derived, Highlight, Sortby
-
-
-class _CompVals(IntEnum):
-    FOLDER = auto()
-    FILE = auto()
-
+from .types import (
+    Badge,
+    Block,
+    Decoration,
+    Decorations,
+    Derived,
+    Highlight,
+    Memo,
+    Modes,
+    Row,
+    Sortby,
+)
+
+K = TypeVar("K")
 
 _Render = Tuple[str, Sequence[Highlight], Sequence[Badge]]
-_NRender = Tuple[Node, str, Sequence[Highlight], Sequence[Badge]]
 
 
 def _gen_comp(sortby: Sequence[Sortby]) -> Callable[[Node], Any]:
     def comp(node: Node) -> Sequence[Any]:
-        def cont() -> Iterator[Any]:
-            for sb in sortby:
-                if sb is Sortby.is_folder:
-                    yield _CompVals.FOLDER if is_dir(node) else _CompVals.FILE
-                elif sb is Sortby.ext:
-                    yield "" if is_dir(node) else strxfrm(node.path.suffix)
-                elif sb is Sortby.file_name:
-                    yield strxfrm(node.path.name)
-                else:
-                    never(sb)
-
-        return tuple(cont())
+        return sort_key(sortby, path=node.path, folder=is_dir(node))
 
     return comp
 
 
-def _vc_ignored(node: Node, vc: VCStatus) -> bool:
-    return not vc.ignored.isdisjoint(node.ancestors | {node.path})
+def _vc_ignored(path: PurePath, vc: VCStatus) -> bool:
+    return not vc.ignored.isdisjoint(map(intern_path, ancestors(path) | {path}))
 
 
 def _gen_spacer(depth: int) -> str:
@@ -59,8 +76,11 @@ def _paint(
     vc: VCStatus,
     show_hidden: bool,
     current: Optional[PurePath],
-) -> Callable[[Node, int], Optional[_Render]]:
+    decorations: Decorations,
+    perm_modes: Modes,
+) -> Callable[[Node, int, bool], Optional[_Render]]:
     icons = settings.view.icons
+    classifiers = settings.classifiers
     context = settings.view.hl_context
     (
         particular_mappings,
@@ -69,7 +89,6 @@ def _paint(
         mode_post,
         ext_exact,
         name_exact,
-        name_glob,
     ) = (
         context.particular_mappings,
         context.icon_exts,
@@ -77,8 +96,9 @@ def _paint(
         context.mode_post,
         context.ext_exact,
         context.name_exact,
-        context.name_glob,
     )
+    perms = stat_perms(settings)
+    use_icons = settings.view.use_icons
 
     def search_icon_hl(node: Node, ignored: bool) -> Optional[str]:
         if ignored:
@@ -86,11 +106,13 @@ def _paint(
         else:
             return icon_exts.get(node.path.suffix)
 
-    def search_text_hl(node: Node, ignored: bool) -> Optional[str]:
+    def search_text_hl(
+        node: Node, node_mode: Mode, glob_idx: Optional[int], ignored: bool
+    ) -> Optional[str]:
         if ignored:
             return particular_mappings.ignored
 
-        s_modes = sorted(node.mode)
+        s_modes = modes(node_mode)
         for mode in s_modes:
             hl = mode_pre.get(mode)
             if hl:
@@ -100,9 +122,8 @@ def _paint(
         if hl:
             return hl
 
-        for pattern, hl in name_glob.items():
-            if fnmatch(node.path.name, pattern):
-                return hl
+        if glob_idx is not None:
+            return classifiers.text_hl.values[glob_idx]
 
         hl = ext_exact.get(node.path.suffix)
         if hl:
@@ -126,23 +147,69 @@ def _paint(
         yield _gen_spacer(depth)
         yield gen_status(node.path)
 
-    def gen_icon(node: Node) -> Iterator[str]:
+    def search_icon(node: Node, glob_idx: Optional[int]) -> str:
+        icon = icons.name_exact.get(node.path.name) or icons.ext_exact.get(
+            node.path.suffix
+        )
+        if icon:
+            return icon
+        elif glob_idx is not None:
+            return classifiers.icon.values[glob_idx]
+        else:
+            return icons.default_icon
+
+    def mode_of(node: Node) -> Mode:
+        if not perms:
+            return node.mode
+        else:
+            cached = perm_modes.get(node.path)
+            if cached and cached[0] is node:
+                _, mode = cached
+            else:
+                mode = node.mode | perm_bits(node)
+                perm_modes[node.path] = (node, mode)
+            return mode
+
+    def decorate(node: Node, ignored: bool) -> Decoration:
+        name, suffix = node.path.name, node.path.suffix
+        mode = node.mode if ignored else mode_of(node)
+        exact = name in icons.name_exact or name in name_exact
+        icon_idx = (
+            None
+            if not use_icons or name in icons.name_exact or suffix in icons.ext_exact
+            else glob_index(classifiers.icon, name)
+        )
+        text_idx = (
+            None
+            if ignored or name in name_exact
+            else glob_index(classifiers.text_hl, name)
+        )
+        key = (name if exact else None, suffix, icon_idx, text_idx, mode, ignored)
+        decoration = decorations.pop(key, None)
+        if not decoration:
+            glyph = (
+                search_icon(node, glob_idx=icon_idx)
+                if use_icons
+                else icons.default_icon
+            )
+            decoration = (
+                glyph,
+                search_icon_hl(node, ignored=ignored),
+                search_text_hl(
+                    node, node_mode=mode, glob_idx=text_idx, ignored=ignored
+                ),
+            )
+            if len(decorations) >= DECORATION_CACHE_SIZE:
+                decorations.pop(next(iter(decorations)))
+        decorations[key] = decoration
+        return decoration
+
+    def gen_icon(node: Node, glyph: str) -> Iterator[str]:
         yield " "
         if is_dir(node):
             yield icons.folder.open if node.path in index else icons.folder.closed
         else:
-            yield (
-                icons.name_exact.get(node.path.name, "")
-                or icons.ext_exact.get(node.path.suffix, "")
-                or next(
-                    (
-                        v
-                        for k, v in icons.name_glob.items()
-                        if fnmatch(node.path.name, k)
-                    ),
-                    icons.default_icon,
-                )
-            ) if settings.view.use_icons else icons.default_icon
+            yield glyph
         yield " "
 
     def gen_name(node: Node) -> Iterator[str]:
@@ -159,55 +226,119 @@ def _paint(
             yield " "
             yield icons.link.normal
 
-    def gen_badges(path: PurePath) -> Iterator[Badge]:
-        qf_count = qf.quick_fix[path]
-        stat = vc.status.get(path)
+    def gen_badges(node: Node) -> Iterator[Badge]:
+        qf_count = qf.quick_fix.get(node.path)
+        stat = vc.status.get(node.id)
         if qf_count:
             yield Badge(text=f"({qf_count})", group=particular_mappings.quickfix)
         if stat:
             yield Badge(text=f" [{stat}]", group=particular_mappings.version_control)
 
     def gen_highlights(
-        node: Node, pre: str, icon: str, name: str, ignored: bool
+        pre: str,
+        icon: str,
+        name: str,
+        icon_group: Optional[str],
+        text_group: Optional[str],
     ) -> Iterator[Highlight]:
         icon_begin = len(pre.encode())
         icon_end = icon_begin + len(icon.encode())
         text_begin = icon_end
         text_end = len(name.encode()) + text_begin
 
-        icon_group = search_icon_hl(node, ignored=ignored)
         if icon_group:
             hl = Highlight(group=icon_group, begin=icon_begin, end=icon_end)
             yield hl
 
-        text_group = search_text_hl(node, ignored=ignored)
         if text_group:
             hl = Highlight(group=text_group, begin=text_begin, end=text_end)
             yield hl
 
-    def show(node: Node, depth: int) -> Optional[_Render]:
-        _user_ignored = user_ignored(node, ignores=settings.ignores)
-        vc_ignored = _vc_ignored(node, vc=vc)
+    def show(node: Node, depth: int, vc_ignored: bool) -> Optional[_Render]:
+        _user_ignored = user_ignored(node, classifiers=classifiers)
         ignored = vc_ignored or _user_ignored
 
         if depth and _user_ignored and not show_hidden:
             return None
         else:
+            glyph, icon_group, text_group = decorate(node, ignored=ignored)
             pre = "".join(gen_decor_pre(node, depth=depth))
-            icon = "".join(gen_icon(node))
+            icon = "".join(gen_icon(node, glyph=glyph))
             name = "".join(gen_name(node))
             post = "".join(gen_decor_post(node))
 
             line = f"{pre}{icon}{name}{post}"
-            badges = tuple(gen_badges(node.path))
+            badges = tuple(gen_badges(node))
             highlights = tuple(
-                gen_highlights(node, pre=pre, icon=icon, name=name, ignored=ignored)
+                gen_highlights(
+                    pre=pre,
+                    icon=icon,
+                    name=name,
+                    icon_group=icon_group,
+                    text_group=text_group,
+                )
             )
             return line, highlights, badges
 
     return show
 
 
+def _more(node: Node, depth: int, group: str) -> Iterator[Row]:
+    if node.truncated:
+        pre = f"{_gen_spacer(depth)}  "
+        text = LANG("more entries", count=node.truncated)
+        line = f"{pre}{text}"
+        begin = len(pre.encode())
+        highlights = (Highlight(group=group, begin=begin, end=len(line.encode())),)
+        yield node.path, line, highlights, (), str(hash((line, highlights)))
+
+
+def _reusable(
+    memo: Memo,
+    settings: Settings,
+    filter_pattern: Optional[FilterPattern],
+    show_hidden: bool,
+) -> bool:
+    return (
+        memo.view is settings.view
+        and memo.ignores is settings.ignores
+        and memo.filter_pattern == (filter_pattern.pattern if filter_pattern else None)
+        and memo.show_hidden == show_hidden
+    )
+
+
+def _changed(prev: Mapping[K, Any], curr: Mapping[K, Any]) -> AbstractSet[K]:
+    if prev is curr:
+        return set()
+    else:
+        return {
+            key for key in prev.keys() | curr.keys() if prev.get(key) != curr.get(key)
+        }
+
+
+def _badged(memo: Memo, markers: Markers, vc: VCStatus) -> AbstractSet[PurePath]:
+    changed = {*_changed(memo.markers.quick_fix, markers.quick_fix)}
+    if memo.vc is not vc:
+        ids = _changed(memo.vc.status, vc.status) | (memo.vc.ignored ^ vc.ignored)
+        changed |= {*map(path_of, ids)}
+    return changed
+
+
+def _dirty(
+    memo: Memo,
+    index: Index,
+    selection: Selection,
+    current: Optional[PurePath],
+    markers: Markers,
+    vc: VCStatus,
+) -> AbstractSet[PurePath]:
+    changed = {*(memo.index ^ index), *(memo.selection ^ selection)}
+    if current != memo.current:
+        changed |= {path for path in (memo.current, current) if path}
+    changed |= _badged(memo, markers=markers, vc=vc)
+    return {ancestor for path in changed for ancestor in ancestors(path)} | changed
+
+
 def render(
     node: Node,
     *,
@@ -219,7 +350,13 @@ def render(
     vc: VCStatus,
     show_hidden: bool,
     current: Optional[PurePath],
+    derived: Optional[Derived] = None,
 ) -> Derived:
+    memo = derived.memo if derived else None
+    decorations: Decorations = (
+        memo.decorations if memo and memo.view is settings.view else {}
+    )
+    perm_modes: Modes = memo.modes if memo else {}
     show = _paint(
         settings,
         index=index,
@@ -228,39 +365,126 @@ def render(
         vc=vc,
         show_hidden=show_hidden,
         current=current,
+        decorations=decorations,
+        perm_modes=perm_modes,
     )
     comp = _gen_comp(settings.view.sort_by)
+    more_group = settings.view.hl_context.particular_mappings.ignored
     keep_open = {node.path}
 
-    def render(node: Node, *, depth: int, cleared: bool) -> Iterator[_NRender]:
+    if memo and _reusable(
+        memo,
+        settings=settings,
+        filter_pattern=filter_pattern,
+        show_hidden=show_hidden,
+    ):
+        prev = memo.blocks
+        dirty = _dirty(
+            memo,
+            index=index,
+            selection=selection,
+            current=current,
+            markers=markers,
+            vc=vc,
+        )
+    else:
+        prev, dirty = {}, set()
+    blocks: MutableMapping[PurePath, Block] = {}
+
+    def render(
+        node: Node, *, depth: int, cleared: bool, vc_ignored: bool
+    ) -> Sequence[Row]:
+        block = prev.get(node.path)
+        if (
+            block
+            and block.node is node
+            and block.depth == depth
+            and block.cleared == cleared
+            and block.vc_ignored == vc_ignored
+            and node.path not in dirty
+        ):
+            blocks[node.path] = block
+            return block.rows
+
         clear = (
             cleared
             or not filter_pattern
             or fnmatch(node.path.name, filter_pattern.pattern)
         )
-        rend = show(node, depth)
+        rend = show(node, depth, vc_ignored)
 
         if rend:
-
-            def gen_children() -> Iterator[_NRender]:
-                for child in sorted(node.children.values(), key=comp):
-                    yield from render(child, depth=depth + 1, cleared=clear)
-
-            children = tuple(gen_children())
+            children = tuple(
+                row
+                for child in sorted(node.children.values(), key=comp)
+                for row in render(
+                    child,
+                    depth=depth + 1,
+                    cleared=clear,
+                    vc_ignored=vc_ignored or child.id in vc.ignored,
+                )
+            )
             if clear or children or node.path in keep_open:
-                yield (node, *rend)
-            yield from iter(children)
+                line, highlights, badges = rend
+                hashed = str(hash(rend))
+                rows: Sequence[Row] = (
+                    (node, line, highlights, badges, hashed),
+                    *children,
+                    *_more(node, depth=depth + 1, group=more_group),
+                )
+            else:
+                rows = children
+        else:
+            rows = ()
 
-    rendered = render(node, depth=0, cleared=False)
-    _nodes, _lines, _highlights, _badges = zip(*rendered)
-    nodes, lines, highlights, badges = (
-        cast(Sequence[Node], _nodes),
+        blocks[node.path] = Block(
+            node=node, depth=depth, cleared=cleared, vc_ignored=vc_ignored, rows=rows
+        )
+        return rows
+
+    rendered = render(
+        node, depth=0, cleared=False, vc_ignored=_vc_ignored(node.path, vc=vc)
+    )
+    _items, _lines, _highlights, _badges, _hashed = zip(*rendered)
+    items, lines, highlights, badges, hashed = (
+        cast(Sequence[Union[Node, PurePath]], _items),
         cast(Sequence[str], _lines),
         cast(Sequence[Sequence[Highlight]], _highlights),
         cast(Sequence[Sequence[Badge]], _badges),
+        cast(Sequence[str], _hashed),
+    )
+    nodes: MutableSequence[Optional[Node]] = []
+    path_row_lookup: MutableMapping[PurePath, int] = {}
+    more_row_lookup: MutableMapping[int, PurePath] = {}
+    for idx, item in enumerate(items):
+        if isinstance(item, Node):
+            nodes.append(item)
+            path_row_lookup[item.path] = idx
+        else:
+            nodes.append(None)
+            more_row_lookup[idx] = item
+
+    memo = Memo(
+        view=settings.view,
+        ignores=settings.ignores,
+        index=index,
+        selection=selection,
+        filter_pattern=filter_pattern.pattern if filter_pattern else None,
+        markers=markers,
+        vc=vc,
+        show_hidden=show_hidden,
+        current=current,
+        blocks={
+            **{path: block for path, block in prev.items() if path in path_row_lookup},
+            **blocks,
+        },
+        decorations=decorations,
+        modes={
+            path: cached
+            for path, cached in perm_modes.items()
+            if path in path_row_lookup
+        },
     )
-    hashed = tuple(str(hash(zipped)) for zipped in zip(lines, highlights, badges))
-    path_row_lookup = {node.path: idx for idx, node in enumerate(nodes)}
     derived = Derived(
         lines=lines,
         highlights=highlights,
@@ -268,5 +492,7 @@ def render(
         hashed=hashed,
         node_row_lookup=nodes,
         path_row_lookup=path_row_lookup,
+        more_row_lookup=more_row_lookup,
+        memo=memo,
     )
     return derived
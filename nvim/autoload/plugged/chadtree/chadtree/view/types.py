@@ -1,13 +1,23 @@
 from dataclasses import dataclass
 from enum import Enum, auto
 from pathlib import PurePath
-from typing import Mapping, Optional, Sequence
+from typing import (
+    AbstractSet,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from pynvim_pp.highlight import HLgroup
 
 from chad_types import IconGlyphs
 
-from ..fs.types import Mode, Node
+from ..fs.types import Ignored, Mode, Node
+from ..nvim.types import Markers
+from ..version_ctl.types import VCStatus
 
 
 @dataclass(frozen=True)
@@ -57,6 +67,39 @@ class Highlight:
     group: str
 
 
+Decoration = Tuple[str, Optional[str], Optional[str]]
+Decorations = MutableMapping[
+    Tuple[Optional[str], str, Optional[int], Optional[int], Mode, bool], Decoration
+]
+Modes = MutableMapping[PurePath, Tuple[Node, Mode]]
+Row = Tuple[Union[Node, PurePath], str, Sequence[Highlight], Sequence[Badge], str]
+
+
+@dataclass(frozen=True)
+class Block:
+    node: Node
+    depth: int
+    cleared: bool
+    vc_ignored: bool
+    rows: Sequence[Row]
+
+
+@dataclass(frozen=True)
+class Memo:
+    view: ViewOptions
+    ignores: Ignored
+    index: AbstractSet[PurePath]
+    selection: AbstractSet[PurePath]
+    filter_pattern: Optional[str]
+    markers: Markers
+    vc: VCStatus
+    show_hidden: bool
+    current: Optional[PurePath]
+    blocks: Mapping[PurePath, Block]
+    decorations: Decorations
+    modes: Modes
+
+
 @dataclass(frozen=True)
 class Derived:
     lines: Sequence[str]
@@ -64,5 +107,8 @@ class Derived:
     badges: Sequence[Sequence[Badge]]
 
     hashed: Sequence[str]
-    node_row_lookup: Sequence[Node]
+    node_row_lookup: Sequence[Optional[Node]]
     path_row_lookup: Mapping[PurePath, int]
+    more_row_lookup: Mapping[int, PurePath]
+
+    memo: Memo
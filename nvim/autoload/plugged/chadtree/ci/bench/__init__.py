@@ -0,0 +1,118 @@
+from json import loads
+from os import chmod, makedirs
+from pathlib import Path, PurePath
+from random import Random
+from time import perf_counter
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, Sequence, Tuple, TypeVar, cast
+
+from std2.pickle import new_decoder
+from yaml import safe_load
+
+from chad_types import (
+    ARTIFACT,
+    Artifact,
+    IconColourSetEnum,
+    IconGlyphSetEnum,
+    LSColoursEnum,
+)
+from chadtree.consts import CONFIG_YML
+from chadtree.fs.glob import compile_glob
+from chadtree.fs.types import Ignored
+from chadtree.settings.types import Classifiers, Settings
+from chadtree.view.load import load_theme
+from chadtree.view.types import HLGroups, Sortby, ViewOptions
+
+T = TypeVar("T")
+
+EXTS = (
+    ".py",
+    ".js",
+    ".ts",
+    ".json",
+    ".md",
+    ".c",
+    ".h",
+    ".rs",
+    ".go",
+    ".txt",
+    ".log",
+    ".png",
+    ".tar.gz",
+    "",
+)
+
+
+def timed(thunk: Callable[[], T], repeat: int = 3) -> Tuple[float, T]:
+    best, ret = float("inf"), cast(T, None)
+    for _ in range(repeat):
+        t1 = perf_counter()
+        ret = thunk()
+        best = min(best, perf_counter() - t1)
+    return best, ret
+
+
+def make_tree(
+    root: Path, folders: int, files: int, seed: int = 0
+) -> Sequence[PurePath]:
+    rand = Random(seed)
+    dirs = [root]
+    makedirs(root, exist_ok=True)
+    for idx in range(folders):
+        path = rand.choice(dirs) / f"d{idx}"
+        makedirs(path, exist_ok=True)
+        dirs.append(path)
+    for idx in range(files):
+        path = rand.choice(dirs) / f"f{idx}{rand.choice(EXTS)}"
+        path.touch()
+        if not idx % 10:
+            chmod(path, 0o755)
+    return dirs
+
+
+def names(count: int, seed: int = 0) -> Iterator[str]:
+    rand = Random(seed)
+    for idx in range(count):
+        yield f"{rand.choice(('', '.', '_'))}f{idx}{rand.choice(EXTS)}"
+
+
+def settings(listing_limit: int = 0) -> Settings:
+    defaults = safe_load(CONFIG_YML.read_text("UTF-8"))
+    artifact = new_decoder[Artifact](Artifact)(loads(ARTIFACT.read_text("UTF-8")))
+    icons, hl_context = load_theme(
+        artifact=artifact,
+        particular_mappings=HLGroups(**defaults["theme"]["highlights"]),
+        discrete_colours=defaults["theme"]["discrete_colour_map"],
+        icon_set=IconGlyphSetEnum.devicons,
+        icon_colour_set=IconColourSetEnum.github,
+        text_colour_set=LSColoursEnum.env,
+    )
+    ignore = defaults["ignore"]
+    ignores = Ignored(
+        name_exact=frozenset(ignore["name_exact"]),
+        name_glob=ignore["name_glob"],
+        path_glob=ignore["path_glob"],
+    )
+    view = ViewOptions(
+        hl_context=hl_context,
+        icons=icons,
+        sort_by=tuple(Sortby[key] for key in defaults["view"]["sort_by"]),
+        time_fmt=defaults["view"]["time_format"],
+        use_icons=True,
+    )
+    classifiers = Classifiers(
+        ignore_name=compile_glob(
+            ((glob, True) for glob in ignores.name_glob),
+            exact_names=((name, True) for name in ignores.name_exact),
+        ),
+        ignore_path=compile_glob((glob, True) for glob in ignores.path_glob),
+        icon=compile_glob(icons.name_glob.items()),
+        text_hl=compile_glob(hl_context.name_glob.items()),
+    )
+    fields: Any = SimpleNamespace(
+        classifiers=classifiers,
+        ignores=ignores,
+        listing_limit=listing_limit,
+        view=view,
+    )
+    return cast(Settings, fields)
@@ -0,0 +1,44 @@
+from argparse import ArgumentParser, Namespace
+from fnmatch import fnmatch
+from typing import Mapping, Optional, Sequence
+
+from chadtree.fs.glob import compile_glob, match_glob
+
+from . import names, settings, timed
+
+
+def _fnmatch(globs: Mapping[str, str], name: str) -> Optional[str]:
+    for glob, value in globs.items():
+        if fnmatch(name, glob):
+            return value
+    else:
+        return None
+
+
+def _parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=50000)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    opts = settings()
+    rows: Sequence[str] = tuple(names(args.nodes))
+    tables = {
+        "text_hl": opts.view.hl_context.name_glob,
+        "icon": opts.view.icons.name_glob,
+    }
+
+    for label, globs in tables.items():
+        compiled = compile_glob(globs.items())
+        loop, expected = timed(lambda: [_fnmatch(globs, name) for name in rows])
+        table, actual = timed(lambda: [match_glob(compiled, name) for name in rows])
+        assert actual == expected
+        print(
+            f"{label:8} {len(globs):4} globs  fnmatch {loop:.3f}s  compiled {table:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
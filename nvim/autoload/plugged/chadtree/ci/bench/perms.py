@@ -0,0 +1,106 @@
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path, PurePath
+from tempfile import TemporaryDirectory
+from typing import AbstractSet, Any, Iterator, Mapping, Optional
+
+import chadtree.view.render
+from chadtree.fs.cartographer import new, perm_bits, stat_perms, update
+from chadtree.fs.types import Mode, Node
+from chadtree.nvim.types import Markers
+from chadtree.settings.types import Settings
+from chadtree.version_ctl.types import VCStatus
+from chadtree.view.render import render
+from chadtree.view.types import Derived
+
+from . import make_tree, settings, timed
+
+_STATS = 0
+
+
+def _counted(node: Node) -> Mode:
+    global _STATS
+    _STATS += 1
+    return perm_bits(node)
+
+
+def _rows(node: Node) -> Iterator[Node]:
+    yield node
+    for child in node.children.values():
+        yield from _rows(child)
+
+
+def _eager(
+    pool: Executor, root: PurePath, index: AbstractSet[PurePath], opts: Settings
+) -> None:
+    for node in _rows(new(pool, root, index, settings=opts, pages={})):
+        perm_bits(node)
+
+
+def _render(
+    node: Node,
+    opts: Settings,
+    index: AbstractSet[PurePath],
+    derived: Optional[Derived] = None,
+) -> Derived:
+    kwargs: Mapping[str, Any] = dict(
+        settings=opts,
+        index=index,
+        selection=frozenset(),
+        filter_pattern=None,
+        markers=Markers(quick_fix={}, bookmarks=frozenset()),
+        vc=VCStatus(),
+        show_hidden=False,
+        current=None,
+    )
+    return render(node, derived=derived, **kwargs)
+
+
+def _parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("--folders", type=int, default=200)
+    parser.add_argument("--files", type=int, default=20000)
+    return parser.parse_args()
+
+
+def main() -> None:
+    global _STATS
+    args = _parse_args()
+    opts = settings()
+    assert stat_perms(opts), "default highlights do not use permission bits"
+    chadtree.view.render.perm_bits = _counted
+
+    with TemporaryDirectory() as tmp, ThreadPoolExecutor() as pool:
+        root = PurePath(tmp)
+        dirs = make_tree(Path(tmp), folders=args.folders, files=args.files)
+        index = frozenset(dirs)
+
+        walk, node = timed(lambda: new(pool, root, index, settings=opts, pages={}))
+        eager, _ = timed(lambda: _eager(pool, root=root, index=index, opts=opts))
+        print(f"rows                         {sum(1 for _ in _rows(node))}")
+        print(f"walk                         {walk:.3f}s")
+        print(f"walk + stat every row        {eager:.3f}s")
+
+        _STATS = 0
+        first, derived = timed(lambda: _render(node, opts, index=index), repeat=1)
+        print(f"first render                 {first:.3f}s {_STATS} stats")
+
+        touched = dirs[len(dirs) // 2]
+        Path(touched, "new.py").touch()
+        _STATS = 0
+        refresh, _ = timed(
+            lambda: _render(
+                update(
+                    pool, node, settings=opts, index=index, pages={}, paths={touched}
+                ),
+                opts,
+                index=index,
+                derived=derived,
+            ),
+            repeat=1,
+        )
+        print(f"update + render one folder   {refresh:.3f}s {_STATS} stats")
+
+
+if __name__ == "__main__":
+    main()
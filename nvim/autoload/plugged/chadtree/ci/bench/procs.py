@@ -0,0 +1,61 @@
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path, PurePath
+from tempfile import TemporaryDirectory
+from typing import Any
+
+import chadtree.fs.cartographer
+from chadtree.fs.cartographer import new
+from chadtree.fs.types import Node
+
+from . import make_tree, settings, timed
+
+
+def _shape(node: Node) -> Any:
+    return (
+        node.path,
+        node.mode,
+        node.signature,
+        node.truncated,
+        {path: _shape(child) for path, child in node.children.items()},
+    )
+
+
+def _parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("--folders", type=int, nargs="*", default=(10, 100, 1000))
+    parser.add_argument("--files-per-folder", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--procs", type=int, default=4)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    opts = settings()
+    chadtree.fs.cartographer.PROCESS_WALK_THRESHOLD = 0
+
+    with ThreadPoolExecutor(max_workers=args.threads) as pool, ProcessPoolExecutor(
+        max_workers=args.procs, mp_context=get_context("spawn")
+    ) as procs:
+        for folders in args.folders:
+            with TemporaryDirectory() as tmp:
+                root = PurePath(tmp)
+                files = folders * args.files_per_folder
+                index = frozenset(make_tree(Path(tmp), folders=folders, files=files))
+
+                threaded, expected = timed(
+                    lambda: new(pool, root, index, settings=opts, pages={})
+                )
+                forked, actual = timed(
+                    lambda: new(pool, root, index, settings=opts, pages={}, procs=procs)
+                )
+                assert _shape(actual) == _shape(expected)
+                print(
+                    f"{folders:6} folders  threads {threaded:.3f}s  procs {forked:.3f}s"
+                )
+
+
+if __name__ == "__main__":
+    main()
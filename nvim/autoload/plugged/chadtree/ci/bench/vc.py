@@ -0,0 +1,130 @@
+from argparse import ArgumentParser, Namespace
+from locale import strxfrm
+from pathlib import PurePath
+from random import Random
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSet,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from std2.pathlib import is_relative_to
+
+from chadtree.fs.intern import path_of
+from chadtree.fs.ops import ancestors
+from chadtree.version_ctl.git import (
+    _SUBMODULE_MARKER,
+    _WHITE_SPACES,
+    _parse,
+    _stat_name,
+)
+
+from . import timed
+
+_ROOT = PurePath("/", "repo")
+_STATS = (" M", "M ", "A ", "??", "!!", "R ", "MM", "D ", " D", "UU")
+
+_Flat = Tuple[AbstractSet[PurePath], Mapping[PurePath, str]]
+
+
+def _visible(path: PurePath, expanded: AbstractSet[PurePath]) -> Iterator[PurePath]:
+    for parent in reversed(path.parents):
+        if parent in expanded:
+            yield parent
+        elif parent.parent in expanded:
+            yield parent
+            break
+
+
+def _flat(
+    root: PurePath,
+    stats: Sequence[Tuple[str, PurePath]],
+    expanded: Optional[AbstractSet[PurePath]],
+) -> _Flat:
+    above = ancestors(root)
+    ignored: MutableSet[PurePath] = set()
+    status: MutableMapping[PurePath, str] = {}
+    directories: MutableMapping[PurePath, MutableSet[str]] = {}
+    relative = (
+        {path.relative_to(root) for path in expanded if is_relative_to(path, root)}
+        if expanded is not None
+        else None
+    )
+
+    for stat, name in stats:
+        if relative is not None and "!" in stat and name.parent not in relative:
+            continue
+        path = root / name
+        if expanded is None or path.parent in expanded:
+            status[path] = _stat_name(stat)
+            if "!" in stat:
+                ignored.add(path)
+        if "!" not in stat:
+            for ancestor in (
+                ancestors(path) if expanded is None else _visible(path, expanded)
+            ):
+                parents = directories.setdefault(ancestor, set())
+                if stat != _SUBMODULE_MARKER:
+                    parents |= {*stat}
+
+    for directory, syms in directories.items():
+        symbols = {*status.get(directory, "")} | syms - _WHITE_SPACES
+        status[directory] = "".join(sorted(symbols, key=strxfrm))
+
+    trimmed = {path: stat for path, stat in status.items() if path not in above}
+    return ignored, trimmed
+
+
+def _trie(
+    root: PurePath,
+    stats: Sequence[Tuple[str, PurePath]],
+    expanded: Optional[AbstractSet[PurePath]],
+) -> _Flat:
+    vc = _parse(root, stats=stats, expanded=expanded)
+    return {*map(path_of, vc.ignored)}, {
+        path_of(pid): stat for pid, stat in vc.status.items()
+    }
+
+
+def _entries(
+    rand: Random, count: int, depth: int, fan: int
+) -> Sequence[Tuple[str, PurePath]]:
+    def names() -> Iterator[PurePath]:
+        for _ in range(count):
+            parts = (f"d{rand.randrange(fan)}" for _ in range(rand.randint(0, depth)))
+            yield PurePath(*parts, f"f{rand.randrange(20)}")
+
+    return tuple((rand.choice(_STATS), name) for name in names())
+
+
+def _parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="*", default=(20000, 100000))
+    parser.add_argument("--expanded", type=int, default=40)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    rand = Random(0)
+
+    for count in args.entries:
+        stats = _entries(rand, count=count, depth=8, fan=6)
+        folders = sorted(
+            {_ROOT / parent for _, name in stats for parent in name.parents}
+        )
+        scoped = frozenset(rand.sample(folders, min(args.expanded, len(folders))))
+        for label, expanded in (("full", None), ("scoped", scoped | {_ROOT})):
+            flat, expected = timed(lambda: _flat(_ROOT, stats, expanded=expanded))
+            trie, actual = timed(lambda: _trie(_ROOT, stats, expanded=expanded))
+            assert actual == expected
+            print(f"{count:7} entries  {label:6}  flat {flat:.3f}s  trie {trie:.3f}s")
+
+
+if __name__ == "__main__":
+    main()